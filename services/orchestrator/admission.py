@@ -0,0 +1,291 @@
+import ipaddress
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("AdmissionControl")
+
+DEFAULT_CLIENT_LIMITS = {
+    "low": {"rate": 0.5, "burst": 5},
+    "medium": {"rate": 1.0, "burst": 10},
+    "high": {"rate": 2.0, "burst": 20},
+    "highest": {"rate": 5.0, "burst": 50},
+}
+
+DEFAULT_PRIORITY_LIMITS = {
+    "low": {"rate": 5.0, "burst": 50},
+    "medium": {"rate": 10.0, "burst": 100},
+    "high": {"rate": 20.0, "burst": 200},
+    "highest": {"rate": 50.0, "burst": 500},
+}
+
+# Fraction of max_queue_depth at which each priority starts being shed
+DEFAULT_SHED_THRESHOLDS = {
+    "low": 0.5,
+    "medium": 0.75,
+    "high": 0.9,
+    "highest": 1.0,
+}
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at ``rate`` tokens per second up to ``capacity``.
+
+    Not thread-safe on its own; callers hold the owning controller's lock.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take ``amount`` tokens if available.
+
+        Returns:
+            Tuple of (acquired, seconds until enough tokens would be available)
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True, 0.0
+        if self.rate <= 0:
+            return False, math.inf
+        return False, (amount - self.tokens) / self.rate
+
+    def refund(self, amount: float) -> None:
+        self._refill(time.monotonic())
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is refused by admission control."""
+
+    def __init__(self, reason: str, retry_after: float, status_code: int = 429):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.status_code = status_code
+
+
+class AdmissionController:
+    """
+    Admission control for task intake.
+
+    A request must get a token from its client's bucket for the requested
+    priority and from the shared bucket of that priority class. Independently,
+    when the number of queued or running tasks crosses a priority's shed
+    threshold, new work of that priority is refused, so ``low`` is shed first
+    and ``highest`` only when the queue is completely full.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the controller.
+
+        Args:
+            config: The "admission" section of the agent configuration
+        """
+        config = config or {}
+        self.client_limits = {**DEFAULT_CLIENT_LIMITS, **config.get("client_limits", {})}
+        self.priority_limits = {**DEFAULT_PRIORITY_LIMITS, **config.get("priority_limits", {})}
+        self.shed_thresholds = {**DEFAULT_SHED_THRESHOLDS, **config.get("shed_thresholds", {})}
+        self.max_queue_depth = int(config.get("max_queue_depth", 1000))
+        self.shed_retry_after = float(config.get("shed_retry_after_seconds", 5))
+        self.max_clients = int(config.get("max_tracked_clients", 10000))
+        # Peers (addresses or CIDR ranges) allowed to name the client they
+        # forward for in X-Client-ID, e.g. the UI service or a gateway
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False)
+            for proxy in config.get("trusted_proxies", [])
+        ]
+
+        self._client_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._priority_buckets = {
+            priority: TokenBucket(float(limits["rate"]), float(limits["burst"]))
+            for priority, limits in self.priority_limits.items()
+        }
+        self._lock = threading.Lock()
+
+    def client_identity(self, peer: Optional[str], claimed: Optional[str] = None) -> str:
+        """
+        Identity that per-client limits are keyed on.
+
+        A client-supplied ID is only honoured from a trusted proxy; anyone
+        else could send a fresh ID per request and never hit their limit.
+
+        Args:
+            peer: Address of the connecting peer
+            claimed: Value of the X-Client-ID header, if any
+
+        Returns:
+            str: The claimed ID when forwarded by a trusted proxy, otherwise
+                the peer address
+        """
+        if not peer:
+            return "anonymous"
+        if claimed and self.trusted_proxies:
+            try:
+                address = ipaddress.ip_address(peer)
+            except ValueError:
+                return peer
+            if any(address in network for network in self.trusted_proxies):
+                return f"proxy:{claimed}"
+        return peer
+
+    def admit(self, client_id: str, priority: str, queue_depth: int) -> None:
+        """
+        Admit a new task or raise AdmissionRejected.
+
+        Args:
+            client_id: Identifier of the submitting client
+            priority: Task priority (low, medium, high, highest)
+            queue_depth: Number of tasks currently created or running
+
+        Raises:
+            AdmissionRejected: When the request is rate limited or shed
+        """
+        threshold = self.shed_thresholds.get(priority, 1.0)
+        if queue_depth >= self.max_queue_depth * threshold:
+            logger.warning(f"Shedding {priority} task from {client_id}: queue depth {queue_depth}")
+            raise AdmissionRejected(
+                f"Server overloaded, {priority} priority work is temporarily refused",
+                self.shed_retry_after,
+                status_code=503,
+            )
+
+        with self._lock:
+            client_bucket = self._client_bucket(client_id, priority)
+            ok, retry_after = client_bucket.try_acquire()
+            if not ok:
+                raise AdmissionRejected(
+                    f"Rate limit exceeded for client {client_id} at {priority} priority",
+                    retry_after,
+                )
+
+            priority_bucket = self._priority_buckets.get(priority)
+            if priority_bucket is not None:
+                ok, retry_after = priority_bucket.try_acquire()
+                if not ok:
+                    # Don't charge the client for a request we refused
+                    client_bucket.refund(1)
+                    raise AdmissionRejected(
+                        f"Rate limit exceeded for {priority} priority",
+                        retry_after,
+                    )
+
+    def _client_bucket(self, client_id: str, priority: str) -> TokenBucket:
+        key = (client_id, priority)
+        bucket = self._client_buckets.get(key)
+        if bucket is None:
+            if len(self._client_buckets) >= self.max_clients:
+                self._prune_idle_clients()
+            limits = self.client_limits.get(priority, DEFAULT_CLIENT_LIMITS["medium"])
+            bucket = TokenBucket(float(limits["rate"]), float(limits["burst"]))
+            self._client_buckets[key] = bucket
+        return bucket
+
+    def _prune_idle_clients(self) -> None:
+        # A full bucket is indistinguishable from a freshly created one
+        for key in [key for key, bucket in self._client_buckets.items() if bucket.is_full()]:
+            del self._client_buckets[key]
+
+
+class ProviderBudget:
+    """
+    Requests-per-minute and tokens-per-minute budget per LLM provider.
+
+    Shared by every LLM caller in the process so concurrent ReAct loops
+    coordinate instead of each discovering the provider's rate limit.
+    Token reservations are made up front for the worst case and the unused
+    part is returned once the actual usage is known.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the budget.
+
+        Args:
+            config: Mapping of provider name to
+                {"requests_per_minute": int, "tokens_per_minute": int};
+                providers that are not listed are unlimited
+        """
+        self._requests: Dict[str, TokenBucket] = {}
+        self._tokens: Dict[str, TokenBucket] = {}
+        for provider, limits in (config or {}).items():
+            if "requests_per_minute" in limits:
+                rpm = float(limits["requests_per_minute"])
+                self._requests[provider] = TokenBucket(rpm / 60.0, rpm)
+            if "tokens_per_minute" in limits:
+                tpm = float(limits["tokens_per_minute"])
+                self._tokens[provider] = TokenBucket(tpm / 60.0, tpm)
+        self._cond = threading.Condition()
+
+    def acquire(self, provider: str, tokens: int, timeout: float = 0.0) -> bool:
+        """
+        Reserve one request and ``tokens`` tokens for a provider.
+
+        Args:
+            provider: Provider name
+            tokens: Worst-case tokens the call may use
+            timeout: Seconds to wait for budget before giving up
+
+        Returns:
+            bool: Whether the reservation was made
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                wait = self._try_reserve(provider, tokens)
+                if wait <= 0:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(wait, remaining))
+
+    def settle(self, provider: str, reserved: int, used: int) -> None:
+        """
+        Return the unused part of a token reservation.
+        """
+        bucket = self._tokens.get(provider)
+        if bucket is None or used >= reserved:
+            return
+        with self._cond:
+            bucket.refund(reserved - used)
+            self._cond.notify_all()
+
+    def _try_reserve(self, provider: str, tokens: int) -> float:
+        request_bucket = self._requests.get(provider)
+        token_bucket = self._tokens.get(provider)
+        if token_bucket is not None:
+            # Never ask for more than the bucket can ever hold
+            tokens = min(tokens, token_bucket.capacity)
+
+        if request_bucket is not None:
+            ok, wait = request_bucket.try_acquire()
+            if not ok:
+                return wait
+        if token_bucket is not None:
+            ok, wait = token_bucket.try_acquire(tokens)
+            if not ok:
+                if request_bucket is not None:
+                    request_bucket.refund(1)
+                return wait
+        return 0.0
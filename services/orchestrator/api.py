@@ -1,25 +1,62 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, status
-from fastapi.responses import JSONResponse
+import startup_profile
+
+# Must run before the remaining imports so they are included in the profile
+startup_profile.install_if_enabled()
+
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
+import asyncio
 import json
 import os
 from datetime import datetime
 import logging
 
+from admission import AdmissionRejected
+from blob_store import InvalidRange, parse_range
+from callbacks import CallbackQueueFull, verify_token
+from metrics import render_orchestrator_metrics
 from orchestrator_agent import OrchestratorAgent
+from profiler import MAX_PROFILE_SECONDS, sample_stacks
+from security import require_admin
+import tracing
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("orchestrator-api")
 
+# Create the orchestrator when the server starts rather than at import time,
+# so importing the app (tests, tooling, worker boot) stays cheap
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_profile.phase("orchestrator_init"):
+        app.state.orchestrator = OrchestratorAgent()
+    if startup_profile.enabled():
+        logger.info(startup_profile.format_report())
+    
+    reaper = asyncio.create_task(app.state.orchestrator.run_deadline_reaper())
+    callback_applier = asyncio.create_task(app.state.orchestrator.run_callback_applier())
+    
+    yield
+    
+    reaper.cancel()
+    callback_applier.cancel()
+    orchestrator = app.state.orchestrator
+    app.state.orchestrator = None
+    await orchestrator.aclose()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="371GPT Orchestrator API",
     description="API for the CEO Orchestrator Agent",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
+app.state.orchestrator = None
 
 # Add CORS middleware
 app.add_middleware(
@@ -30,20 +67,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize orchestrator agent
-orchestrator = OrchestratorAgent()
+# Server span for every request, continuing the caller's trace if it sent one
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    with tracing.start_span(
+        f"{request.method} {request.url.path}",
+        {"http.method": request.method, "http.target": request.url.path},
+        parent=tracing.extract(request.headers),
+        kind=tracing.KIND_SERVER
+    ) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            # Name by route template so task IDs don't explode span cardinality
+            span.name = f"{request.method} {route.path}"
+        span.set_attribute("http.status_code", response.status_code)
+        response.headers["traceparent"] = span.context.traceparent
+        return response
+
+# Orchestrator dependency; unavailable until the lifespan has created it
+def get_orchestrator(request: Request) -> OrchestratorAgent:
+    orchestrator = request.app.state.orchestrator
+    if orchestrator is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Orchestrator is not ready",
+            headers={"Retry-After": "1"}
+        )
+    return orchestrator
 
 # Pydantic models for request/response validation
 class AgentInfo(BaseModel):
     name: str
     endpoint: str
+    replicas: Optional[List[str]] = None
     description: Optional[str] = None
     capabilities: Optional[List[str]] = None
 
+class TaskBudget(BaseModel):
+    max_steps: Optional[int] = Field(default=None, ge=0)
+    max_seconds: Optional[float] = Field(default=None, ge=0)
+    max_tokens: Optional[int] = Field(default=None, ge=0)
+
 class TaskCreate(BaseModel):
     description: str
-    priority: str = Field(default="medium", regex="^(low|medium|high|highest)$")
+    priority: str = Field(default="medium", pattern="^(low|medium|high|highest)$")
     metadata: Optional[Dict[str, Any]] = None
+    budget: Optional[TaskBudget] = None
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
 
 class TaskResponse(BaseModel):
     task_id: str
@@ -54,21 +125,68 @@ class AgentResponse(BaseModel):
     id: str
     name: str
     endpoint: str
+    replicas: Optional[List[str]] = None
     description: Optional[str] = None
     capabilities: Optional[List[str]] = None
 
+class CallbackPayload(BaseModel):
+    dispatch_id: str
+    # Increasing per dispatch; lets replayed or reordered progress be ignored
+    seq: int = Field(ge=0)
+    type: str = Field(pattern="^(progress|result|error)$")
+    data: Optional[Any] = None
+
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
 
-# Health check endpoint
+# Liveness: the process is up and serving requests
 @app.get("/health", status_code=200)
 def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+# Readiness: the orchestrator has been initialised and can take work
+@app.get("/ready")
+def readiness_check(request: Request):
+    ready = request.app.state.orchestrator is not None
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "starting",
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+# Runtime metrics in Prometheus text format
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics(orchestrator: OrchestratorAgent = Depends(get_orchestrator)):
+    return render_orchestrator_metrics(orchestrator)
+
+# Sampling profile of the live process (admin only)
+@app.get("/debug/profile", dependencies=[Depends(require_admin)])
+async def debug_profile(
+    seconds: float = Query(default=10.0, gt=0, le=MAX_PROFILE_SECONDS),
+    format: str = Query(default="json", pattern="^(json|collapsed)$"),
+    mode: str = Query(default="cpu", pattern="^(cpu|wall)$")
+):
+    # Sample from a worker thread so the event loop keeps serving (and is
+    # itself part of the profile)
+    profile = await asyncio.to_thread(sample_stacks, seconds, mode=mode)
+    if format == "collapsed":
+        return PlainTextResponse(profile["collapsed"])
+    return profile
+
+# Startup profile (only available when STARTUP_PROFILE=1)
+@app.get("/debug/startup")
+def startup_report():
+    report = startup_profile.report()
+    if report is None:
+        raise HTTPException(status_code=404, detail="Startup profiling is disabled")
+    return report
+
 # Register a new agent
 @app.post("/agents", response_model=AgentResponse, status_code=201)
-def register_agent(agent_info: AgentInfo):
+def register_agent(agent_info: AgentInfo, orchestrator: OrchestratorAgent = Depends(get_orchestrator)):
     try:
         agent_id = f"{agent_info.name.lower().replace(' ', '_')}_agent"
         success = orchestrator.register_agent(agent_id, agent_info.dict())
@@ -89,7 +207,7 @@ def register_agent(agent_info: AgentInfo):
 
 # List all registered agents
 @app.get("/agents", response_model=List[AgentResponse])
-def list_agents():
+def list_agents(orchestrator: OrchestratorAgent = Depends(get_orchestrator)):
     try:
         agents = orchestrator.list_agents()
         return agents
@@ -102,7 +220,7 @@ def list_agents():
 
 # Unregister an agent
 @app.delete("/agents/{agent_id}", status_code=204)
-def unregister_agent(agent_id: str):
+def unregister_agent(agent_id: str, orchestrator: OrchestratorAgent = Depends(get_orchestrator)):
     try:
         success = orchestrator.unregister_agent(agent_id)
         
@@ -122,13 +240,39 @@ def unregister_agent(agent_id: str):
             detail=f"Internal server error: {str(e)}"
         )
 
+# Admission control for task intake
+def admit_task(
+    task: TaskCreate,
+    request: Request,
+    orchestrator: OrchestratorAgent = Depends(get_orchestrator)
+) -> None:
+    client_id = orchestrator.admission.client_identity(
+        request.client.host if request.client else None,
+        request.headers.get("X-Client-ID")
+    )
+    try:
+        orchestrator.admission.admit(client_id, task.priority, orchestrator.queue_depth())
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
 # Create a new task
-@app.post("/tasks", response_model=TaskResponse, status_code=201)
-def create_task(task: TaskCreate):
+@app.post(
+    "/tasks",
+    response_model=TaskResponse,
+    status_code=201,
+    dependencies=[Depends(admit_task)]
+)
+def create_task(task: TaskCreate, orchestrator: OrchestratorAgent = Depends(get_orchestrator)):
     try:
         task_id = orchestrator.create_task(
             task_description=task.description,
-            priority=task.priority
+            priority=task.priority,
+            budget=task.budget.dict(exclude_none=True) if task.budget else None,
+            deadline_seconds=task.deadline_seconds
         )
         
         return {
@@ -145,11 +289,12 @@ def create_task(task: TaskCreate):
 
 # Get task status
 @app.get("/tasks/{task_id}")
-def get_task_status(task_id: str):
+def get_task_status(task_id: str, orchestrator: OrchestratorAgent = Depends(get_orchestrator)):
     try:
         status = orchestrator.get_task_status(task_id)
         
-        if "error" in status:
+        # A failed task carries an "error" too; only a missing one lacks a status
+        if "status" not in status:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Task {task_id} not found"
@@ -165,9 +310,62 @@ def get_task_status(task_id: str):
             detail=f"Internal server error: {str(e)}"
         )
 
+# Download a task output or artifact, optionally a byte range of it
+@app.get("/tasks/{task_id}/artifacts/{digest}")
+def get_task_artifact(
+    task_id: str,
+    digest: str,
+    request: Request,
+    orchestrator: OrchestratorAgent = Depends(get_orchestrator)
+):
+    artifact = orchestrator.get_task_artifact(task_id, digest)
+    if artifact is None or not orchestrator.blob_store.exists(digest):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Artifact {digest} not found for task {task_id}"
+        )
+    
+    size = artifact["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{digest}"',
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "Content-Disposition": f'inline; filename="{artifact["name"]}"',
+    }
+    
+    if request.headers.get("If-None-Match") == f'"{digest}"':
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        byte_range = parse_range(request.headers.get("Range"), size)
+    except InvalidRange:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return StreamingResponse(
+        orchestrator.blob_store.stream(digest, start, end),
+        status_code=status_code,
+        media_type=artifact["content_type"],
+        headers=headers
+    )
+
 # Execute a task
 @app.post("/tasks/{task_id}/execute", status_code=200)
-def execute_task(task_id: str):
+async def execute_task(
+    task_id: str,
+    orchestrator: OrchestratorAgent = Depends(get_orchestrator)
+):
     try:
         success = orchestrator.execute_task(task_id)
         
@@ -177,6 +375,9 @@ def execute_task(task_id: str):
                 detail=f"Task {task_id} not found or cannot be executed"
             )
         
+        # Run the ReAct loop in the background, bounded by the task deadline
+        orchestrator.start_task(task_id)
+        
         return {"status": "executing", "task_id": task_id}
     except HTTPException:
         raise
@@ -187,12 +388,63 @@ def execute_task(task_id: str):
             detail=f"Internal server error: {str(e)}"
         )
 
+# Cancel a task and all of its outstanding work. Async so the running
+# asyncio task is cancelled and the status counters updated on the event loop
+@app.post("/tasks/{task_id}/cancel", status_code=200)
+async def cancel_task(
+    task_id: str,
+    orchestrator: OrchestratorAgent = Depends(get_orchestrator)
+):
+    status = orchestrator.get_task_status(task_id)
+    if "status" not in status:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Task {task_id} not found"
+        )
+    
+    if not orchestrator.cancel_task(task_id):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task {task_id} has already finished ({status['status']})"
+        )
+    
+    return {"status": "cancelled", "task_id": task_id}
+
+# Progress and results reported by agents that accepted work with 202.
+# Authenticated with the per-dispatch token sent in X-Callback-Token, as
+# "Authorization: Bearer <token>". Async so enqueueing runs on the event loop.
+@app.post("/callbacks", status_code=202)
+async def ingest_callback(
+    payload: CallbackPayload,
+    request: Request,
+    orchestrator: OrchestratorAgent = Depends(get_orchestrator)
+):
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not verify_token(payload.dispatch_id, token):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid callback token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    try:
+        await orchestrator.submit_callback(payload.dispatch_id, payload.seq, payload.type, payload.data)
+    except CallbackQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Callback queue is full",
+            headers={"Retry-After": "1"}
+        )
+    
+    return {"status": "queued", "dispatch_id": payload.dispatch_id}
+
 # Exception handler for custom error responses
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail},
+        headers=getattr(exc, "headers", None),
     )
 
 # Global exception handler
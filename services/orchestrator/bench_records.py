@@ -0,0 +1,152 @@
+"""
+Memory and lookup benchmark for in-memory task records.
+
+Builds N tasks as the orchestrator stores them (TaskRecord) and, for
+comparison, as the free-form dicts used previously, then reports the memory
+held per task, how many tasks fit in 1 GiB, and lookup throughput for a
+status read and for the API conversion done by get_task_status.
+
+Usage:
+    python bench_records.py [--sizes 100000 1000000] [--lookups 200000] [--json out.json]
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+import uuid
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List
+
+from react_executor import StepBudget
+from records import TaskPriority, TaskRecord
+
+PRIORITIES = ["low", "medium", "high", "highest"]
+TRACEPARENT = "00-{:032x}-{:016x}-01"
+
+
+def _fields(i: int, now: float) -> Dict[str, Any]:
+    return {
+        "description": f"Research vendor options for project {i} and summarise the top candidates",
+        "priority": PRIORITIES[i % 4],
+        "created_at": now + i * 0.001,
+        "deadline": now + i * 0.001 + 1800,
+        "trace_parent": TRACEPARENT.format(random.getrandbits(128), random.getrandbits(64)),
+    }
+
+
+def build_dicts(n: int) -> Dict[str, Any]:
+    default_budget = StepBudget()
+    now = time.time()
+    tasks = {}
+    for i in range(n):
+        f = _fields(i, now)
+        tasks[str(uuid.uuid4())] = {
+            "description": f["description"],
+            "priority": f["priority"],
+            "status": "created",
+            "created_at": f["created_at"],
+            "deadline": f["deadline"],
+            "sub_tasks": [],
+            "budget": asdict(default_budget),
+            "result": None,
+            "artifacts": [],
+            "trace_parent": f["trace_parent"],
+            "plan_source": "none",
+        }
+    return tasks
+
+
+def build_records(n: int) -> Dict[str, Any]:
+    default_budget = StepBudget()
+    now = time.time()
+    tasks = {}
+    for i in range(n):
+        f = _fields(i, now)
+        task = TaskRecord(
+            description=f["description"],
+            priority=TaskPriority(f["priority"]),
+            created_at=f["created_at"],
+            deadline=f["deadline"],
+            budget=default_budget,
+            trace_parent=f["trace_parent"],
+        )
+        task.plan_source = "none"
+        tasks[str(uuid.uuid4())] = task
+    return tasks
+
+
+def _measure_build(build: Callable[[int], Dict[str, Any]], n: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tasks = build(n)
+    build_seconds = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tasks, held, build_seconds
+
+
+def _rate(fn: Callable[[Dict[str, Any], str], Any], tasks: Dict[str, Any], keys: List[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        fn(tasks, key)
+    return len(keys) / (time.perf_counter() - start)
+
+
+def run(kind: str, n: int, lookups: int) -> Dict[str, Any]:
+    build = build_records if kind == "records" else build_dicts
+    tasks, held, build_seconds = _measure_build(build, n)
+    keys = random.choices(list(tasks), k=lookups)
+
+    if kind == "records":
+        status_rate = _rate(lambda t, k: t[k].status, tasks, keys)
+        api_rate = _rate(lambda t, k: t[k].to_dict(), tasks, keys)
+    else:
+        # The old get_task_status returned the stored dict itself
+        status_rate = _rate(lambda t, k: t[k]["status"], tasks, keys)
+        api_rate = _rate(lambda t, k: t[k], tasks, keys)
+
+    del tasks, keys
+    gc.collect()
+    return {
+        "representation": kind,
+        "tasks": n,
+        "bytes_total": held,
+        "bytes_per_task": round(held / n, 1),
+        "tasks_per_gib": int((1 << 30) / (held / n)),
+        "build_seconds": round(build_seconds, 3),
+        "status_lookups_per_second": int(status_rate),
+        "api_conversions_per_second": int(api_rate),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    header = f"{'representation':<14} {'tasks':>9} {'MiB':>8} {'B/task':>8} {'tasks/GiB':>10} {'status/s':>11} {'to_api/s':>11}"
+    print(header)
+    print("-" * len(header))
+    for n in args.sizes:
+        for kind in ("dicts", "records"):
+            r = run(kind, n, args.lookups)
+            results.append(r)
+            print(
+                f"{r['representation']:<14} {r['tasks']:>9} {r['bytes_total'] / (1 << 20):>8.1f} "
+                f"{r['bytes_per_task']:>8} {r['tasks_per_gib']:>10} "
+                f"{r['status_lookups_per_second']:>11} {r['api_conversions_per_second']:>11}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
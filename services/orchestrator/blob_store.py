@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import mmap
+import os
+import re
+import tempfile
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger("BlobStore")
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Size of the chunks handed to the response stream
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Next to the service code, i.e. /app/data/blobs in the container
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "blobs")
+
+
+class InvalidRange(ValueError):
+    """Raised when an HTTP Range header cannot be satisfied."""
+
+
+class BlobStore:
+    """
+    Content-addressed, deduplicating on-disk store for task outputs.
+
+    Blobs are keyed by the SHA-256 of their content and laid out as
+    ``<root>/<first two hex chars>/<digest>``. Writing the same content twice
+    stores it once. Writes go to a temporary file that is renamed into place,
+    so readers never see a partial blob. Directories are created on the
+    first write, so constructing a store never touches the filesystem.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize the blob store.
+
+        Args:
+            root: Directory holding the blobs; defaults to BLOB_STORE_PATH,
+                or a data directory next to the service
+        """
+        self.root = root or os.environ.get("BLOB_STORE_PATH") or DEFAULT_ROOT
+
+    @staticmethod
+    def is_valid_digest(digest: str) -> bool:
+        return bool(_DIGEST_RE.match(digest or ""))
+
+    def path(self, digest: str) -> str:
+        """
+        Filesystem path of a blob.
+
+        Raises:
+            ValueError: If the digest is malformed
+        """
+        if not self.is_valid_digest(digest):
+            raise ValueError(f"Invalid digest: {digest}")
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data: Union[bytes, str]) -> Dict[str, Union[str, int]]:
+        """
+        Store content and return its reference.
+
+        Args:
+            data: Content to store; str is encoded as UTF-8
+
+        Returns:
+            Dict with the hex SHA-256 digest and size in bytes
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            logger.info(f"Stored blob {digest} ({len(data)} bytes)")
+
+        return {"digest": digest, "size": len(data)}
+
+    def exists(self, digest: str) -> bool:
+        return self.is_valid_digest(digest) and os.path.exists(self.path(digest))
+
+    def size(self, digest: str) -> int:
+        return os.path.getsize(self.path(digest))
+
+    def get(self, digest: str) -> bytes:
+        """
+        Read a whole blob into memory. Prefer stream() for large blobs.
+        """
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def stream(self, digest: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yield a byte range of a blob in chunks read from a memory map.
+
+        Only one chunk is materialised at a time, so serving a large blob
+        never loads it into memory and pages come straight from the page
+        cache. ASGI requires bytes bodies, hence the per-chunk slice.
+
+        Args:
+            digest: Blob digest
+            start: First byte offset (inclusive)
+            end: Last byte offset (inclusive); defaults to the end of the blob
+        """
+        with open(self.path(digest), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            if end is None:
+                end = size - 1
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                offset = start
+                while offset <= end:
+                    chunk_end = min(offset + STREAM_CHUNK_SIZE, end + 1)
+                    yield mapped[offset:chunk_end]
+                    offset = chunk_end
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header.
+
+    Args:
+        header: Value of the Range header, or None
+        size: Size of the resource in bytes
+
+    Returns:
+        Tuple of inclusive (start, end) offsets, or None to serve the whole blob
+
+    Raises:
+        InvalidRange: If the range is malformed or unsatisfiable
+    """
+    if not header:
+        return None
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        # Multipart ranges are not supported; serve the full content instead
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise InvalidRange(header)
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        raise InvalidRange(header)
+
+    end = min(end, size - 1)
+    if start < 0 or start >= size or end < start:
+        raise InvalidRange(header)
+    return start, end
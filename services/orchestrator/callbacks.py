@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("Callbacks")
+
+# Only this process signs and verifies callback tokens (pending dispatches
+# live in its memory), so without CALLBACK_SECRET a random key is used
+_secret = os.environ.get("CALLBACK_SECRET")
+CALLBACK_SECRET: bytes = _secret.encode("utf-8") if _secret else secrets.token_bytes(32)
+
+# Headers sent with each dispatch so the agent can report back asynchronously
+CALLBACK_URL_HEADER = "X-Callback-URL"
+CALLBACK_TOKEN_HEADER = "X-Callback-Token"
+DISPATCH_ID_HEADER = "X-Dispatch-ID"
+
+# Callback update kinds; result and error complete a dispatch
+UPDATE_KINDS = ("progress", "result", "error")
+
+
+def sign_dispatch(dispatch_id: str) -> str:
+    """
+    Callback token for a dispatch.
+
+    The token is an HMAC of the dispatch id, so the orchestrator can verify it
+    without storing it and an agent can only report on its own dispatch.
+    """
+    return hmac.new(CALLBACK_SECRET, dispatch_id.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def verify_token(dispatch_id: str, token: Optional[str]) -> bool:
+    return bool(token) and hmac.compare_digest(sign_dispatch(dispatch_id), token)
+
+
+class CallbackUpdate:
+    """A progress report or result posted by an agent for one dispatch."""
+
+    __slots__ = ("dispatch_id", "seq", "kind", "data", "data_ref", "received_at")
+
+    def __init__(
+        self,
+        dispatch_id: str,
+        seq: int,
+        kind: str,
+        data: Any = None,
+        data_ref: Optional[Dict[str, Any]] = None,
+    ):
+        self.dispatch_id = dispatch_id
+        self.seq = seq
+        self.kind = kind
+        self.data = data
+        # Blob store reference replacing ``data`` when the payload is large
+        self.data_ref = data_ref
+        self.received_at = time.time()
+
+
+class PendingDispatch:
+    """
+    An agent call whose outcome will arrive through /callbacks.
+
+    ``last_seq`` is the highest progress sequence number applied so far and
+    ``done`` is set by the first result or error; both make replayed and
+    late updates no-ops.
+    """
+
+    __slots__ = ("task_id", "agent_id", "future", "last_seq", "done")
+
+    def __init__(self, task_id: Optional[str], agent_id: str, future: "asyncio.Future"):
+        self.task_id = task_id
+        self.agent_id = agent_id
+        self.future = future
+        self.last_seq = -1
+        self.done = False
+
+
+class CallbackQueueFull(Exception):
+    """Raised when the ingestion queue cannot take more updates."""
+
+
+class CallbackQueue:
+    """
+    Bounded queue between the /callbacks endpoint and task state.
+
+    The endpoint only verifies and enqueues; run() drains the queue in
+    batches of up to ``max_batch`` updates (or whatever arrived within
+    ``flush_interval`` of the first one) and hands each batch to a single
+    apply function, so a burst of callbacks costs one pass over task state
+    instead of one per request.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            config: Optional dict with max_queue, max_batch and
+                flush_interval_seconds
+        """
+        config = config or {}
+        self.max_batch = int(config.get("max_batch", 256))
+        self.flush_interval = float(config.get("flush_interval_seconds", 0.05))
+        self._queue: "asyncio.Queue[CallbackUpdate]" = asyncio.Queue(maxsize=int(config.get("max_queue", 10000)))
+
+        self.received = 0
+        self.batches = 0
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, update: CallbackUpdate) -> None:
+        """
+        Enqueue an update without waiting.
+
+        Raises:
+            CallbackQueueFull: If the queue is at capacity
+        """
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            raise CallbackQueueFull()
+        self.received += 1
+
+    async def next_batch(self) -> List[CallbackUpdate]:
+        """
+        Wait for at least one update and return the batch it starts.
+        """
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self, apply: Callable[[List[CallbackUpdate]], Any]) -> None:
+        """
+        Apply queued updates in batches until cancelled.
+
+        Args:
+            apply: Called with each batch on the event loop
+        """
+        while True:
+            batch = await self.next_batch()
+            self.batches += 1
+            try:
+                apply(batch)
+            except Exception as e:
+                logger.error(f"Failed to apply {len(batch)} callback updates: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.qsize(),
+            "received": self.received,
+            "batches": self.batches,
+        }
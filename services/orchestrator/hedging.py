@@ -0,0 +1,221 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent import futures
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger("Hedging")
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies per target."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, target: str, latency: float) -> None:
+        with self._lock:
+            self._samples[target].append(latency)
+
+    def percentile(self, target: str, q: float = 0.95) -> Optional[float]:
+        """
+        Observed latency percentile for a target, or None if too few samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(target, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class HedgePolicy:
+    """
+    Decides when to send a duplicate request and keeps hedging within budget.
+
+    A call is hedged once it has been outstanding for longer than the
+    target's observed p95 latency. The number of hedges is capped at
+    ``budget_ratio`` of all calls, so at most that fraction of extra load is
+    added. Per-target counters are exposed through stats().
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the policy.
+
+        Args:
+            config: The "hedging" section of the agent configuration
+        """
+        config = config or {}
+        self.enabled = bool(config.get("enabled", False))
+        self.budget_ratio = float(config.get("budget_ratio", 0.05))
+        self.percentile = float(config.get("percentile", 0.95))
+        self.min_delay = float(config.get("min_delay_seconds", 0.05))
+        self.latencies = LatencyTracker(
+            window=int(config.get("window", 200)),
+            min_samples=int(config.get("min_samples", 20)),
+        )
+        self._calls = 0
+        self._hedges = 0
+        self._per_target: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "hedges": 0, "hedge_wins": 0}
+        )
+        self.max_threads = int(config.get("max_threads", 32))
+        self._pool: Optional[futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, target: str) -> Optional[float]:
+        """
+        Seconds to wait before hedging a call to ``target``, or None to not hedge.
+        """
+        if not self.enabled:
+            return None
+        p95 = self.latencies.percentile(target, self.percentile)
+        if p95 is None:
+            return None
+        return max(p95, self.min_delay)
+
+    def _record_call(self, target: str) -> None:
+        with self._lock:
+            self._calls += 1
+            self._per_target[target]["calls"] += 1
+
+    def _try_spend(self, target: str) -> bool:
+        with self._lock:
+            # Allow the first hedge only once there is traffic to measure against
+            if self._hedges + 1 > self._calls * self.budget_ratio:
+                return False
+            self._hedges += 1
+            self._per_target[target]["hedges"] += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hedge counters overall and per target.
+        """
+        with self._lock:
+            per_target = {
+                target: {
+                    **counts,
+                    "hedge_rate": round(counts["hedges"] / counts["calls"], 4) if counts["calls"] else 0.0,
+                    "p95_latency": self.latencies.percentile(target, self.percentile),
+                }
+                for target, counts in self._per_target.items()
+            }
+            return {
+                "enabled": self.enabled,
+                "budget_ratio": self.budget_ratio,
+                "calls": self._calls,
+                "hedges": self._hedges,
+                "hedge_rate": round(self._hedges / self._calls, 4) if self._calls else 0.0,
+                "targets": per_target,
+            }
+
+    async def call(
+        self,
+        target: str,
+        primary: Callable[[], Awaitable[Any]],
+        backup: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Run ``primary`` and, if it is slow, race it against ``backup``.
+
+        The first attempt to complete successfully wins and the other one is
+        cancelled. If the first to finish fails, the other attempt is still
+        awaited.
+
+        Args:
+            target: Name under which latency and hedge counts are tracked
+            primary: Coroutine factory for the normal call
+            backup: Coroutine factory for the duplicate (e.g. another replica);
+                without one, no hedging happens
+
+        Returns:
+            The result of the winning attempt
+        """
+        self._record_call(target)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        delay = self.hedge_delay(target) if backup is not None else None
+
+        attempts = [asyncio.ensure_future(primary())]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._try_spend(target):
+                    logger.info(f"Hedging call to {target} after {delay:.3f}s")
+                    attempts.append(asyncio.ensure_future(backup()))
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        self._record_success(target, loop.time() - started, attempt is not attempts[0])
+                        return attempt.result()
+            # Every attempt failed: surface the primary's error
+            return attempts[0].result()
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    def call_sync(
+        self,
+        target: str,
+        primary: Callable[[], Any],
+        backup: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Blocking counterpart of call() for synchronous clients.
+
+        Attempts run on a thread pool. A thread cannot be interrupted, so the
+        losing attempt is abandoned rather than cancelled: it finishes in the
+        background and its result is discarded.
+        """
+        self._record_call(target)
+        started = time.monotonic()
+        delay = self.hedge_delay(target) if backup is not None else None
+        if delay is None:
+            result = primary()
+            self._record_success(target, time.monotonic() - started, False)
+            return result
+
+        # Each attempt runs in a copy of the caller's context so that context
+        # variables (trace context, deadlines) follow it onto the pool thread
+        pool = self._thread_pool()
+        attempts = [pool.submit(contextvars.copy_context().run, primary)]
+        done, _ = futures.wait(attempts, timeout=delay)
+        if not done and self._try_spend(target):
+            logger.info(f"Hedging call to {target} after {delay:.3f}s")
+            attempts.append(pool.submit(contextvars.copy_context().run, backup))
+
+        pending = set(attempts)
+        while pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    self._record_success(target, time.monotonic() - started, attempt is not attempts[0])
+                    return attempt.result()
+        return attempts[0].result()
+
+    def _record_success(self, target: str, latency: float, hedge_won: bool) -> None:
+        self.latencies.record(target, latency)
+        if hedge_won:
+            with self._lock:
+                self._per_target[target]["hedge_wins"] += 1
+
+    def _thread_pool(self) -> futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = futures.ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix="hedge"
+                )
+            return self._pool
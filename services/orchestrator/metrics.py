@@ -0,0 +1,131 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Sample = Tuple[Dict[str, str], Optional[float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_metric(name: str, metric_type: str, help_text: str, samples: Iterable[Sample]) -> List[str]:
+    """
+    Render one metric family in the Prometheus text exposition format.
+
+    Args:
+        name: Metric name
+        metric_type: counter or gauge
+        help_text: Description shown by Prometheus
+        samples: (labels, value) pairs; samples with a None value are skipped
+
+    Returns:
+        List of exposition lines
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in sorted(labels.items()))
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return lines
+
+
+def render_orchestrator_metrics(orchestrator: Any) -> str:
+    """
+    Collect the orchestrator's runtime metrics in Prometheus text format.
+
+    Args:
+        orchestrator: OrchestratorAgent instance
+
+    Returns:
+        str: Exposition text
+    """
+    hedging = orchestrator.hedge_policy.stats()
+    targets = hedging["targets"]
+    routing = orchestrator.model_router.stats()
+
+    lines: List[str] = []
+    lines += format_metric(
+        "orchestrator_queue_depth", "gauge",
+        "Tasks that are created or running",
+        [({}, orchestrator.queue_depth())],
+    )
+    lines += format_metric(
+        "orchestrator_hedge_calls_total", "counter",
+        "Calls made through the hedging policy",
+        [({"target": t}, s["calls"]) for t, s in targets.items()],
+    )
+    lines += format_metric(
+        "orchestrator_hedges_total", "counter",
+        "Duplicate requests sent because a call exceeded its p95 latency",
+        [({"target": t}, s["hedges"]) for t, s in targets.items()],
+    )
+    lines += format_metric(
+        "orchestrator_hedge_wins_total", "counter",
+        "Hedged calls where the duplicate answered first",
+        [({"target": t}, s["hedge_wins"]) for t, s in targets.items()],
+    )
+    lines += format_metric(
+        "orchestrator_hedge_rate", "gauge",
+        "Fraction of calls that were hedged",
+        [({"target": t}, s["hedge_rate"]) for t, s in targets.items()]
+        + [({"target": "all"}, hedging["hedge_rate"])],
+    )
+    lines += format_metric(
+        "orchestrator_call_p95_latency_seconds", "gauge",
+        "Observed p95 latency per call target",
+        [({"target": t}, s["p95_latency"]) for t, s in targets.items()],
+    )
+    lines += format_metric(
+        "orchestrator_model_error_rate", "gauge",
+        "Error rate per model target over the SLO window",
+        [({"target": t}, s["error_rate"]) for t, s in routing.items()],
+    )
+    lines += format_metric(
+        "orchestrator_model_healthy", "gauge",
+        "Whether a model target currently meets its SLO",
+        [({"target": t}, int(s["healthy"])) for t, s in routing.items()],
+    )
+    callbacks = orchestrator.callbacks.stats()
+    lines += format_metric(
+        "orchestrator_callback_queue_depth", "gauge",
+        "Agent callbacks waiting to be applied",
+        [({}, callbacks["queued"])],
+    )
+    lines += format_metric(
+        "orchestrator_callbacks_received_total", "counter",
+        "Agent callbacks accepted by the ingestion endpoint",
+        [({}, callbacks["received"])],
+    )
+    lines += format_metric(
+        "orchestrator_callback_batches_total", "counter",
+        "Batches of agent callbacks applied to task state",
+        [({}, callbacks["batches"])],
+    )
+    lines += format_metric(
+        "orchestrator_callbacks_applied_total", "counter",
+        "Agent callbacks that changed dispatch or task state",
+        [({}, orchestrator.callbacks_applied)],
+    )
+    lines += format_metric(
+        "orchestrator_callbacks_ignored_total", "counter",
+        "Duplicate, stale or unknown agent callbacks",
+        [({}, orchestrator.callbacks_ignored)],
+    )
+    if orchestrator.plan_cache is not None:
+        plan_cache = orchestrator.plan_cache.stats()
+        lines += format_metric(
+            "orchestrator_plan_cache_lookups_total", "counter",
+            "Plan cache lookups",
+            [({}, plan_cache["lookups"])],
+        )
+        lines += format_metric(
+            "orchestrator_plan_cache_hits_total", "counter",
+            "Plan cache lookups served by a cached plan",
+            [({}, plan_cache["hits"])],
+        )
+        lines += format_metric(
+            "orchestrator_plan_cache_size", "gauge",
+            "Plans currently cached",
+            [({}, plan_cache["size"])],
+        )
+    return "\n".join(lines) + "\n"
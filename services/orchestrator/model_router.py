@@ -0,0 +1,195 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("ModelRouter")
+
+PRIORITIES = ("low", "medium", "high", "highest")
+
+# Words that usually mean multi-step reasoning or code generation
+_COMPLEX_HINTS = re.compile(
+    r"\b(implement|design|architect|refactor|analy[sz]e|compare|plan|"
+    r"optimi[sz]e|debug|migrate|integrate|evaluate|strategy)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class ModelTarget:
+    """A model served by a specific provider."""
+    provider: str
+    model: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}/{self.model}"
+
+
+class _TargetStats:
+    """Sliding window of latencies and outcomes for one target."""
+
+    def __init__(self, window: int):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self.tripped_until = 0.0
+
+    def p95_latency(self) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+
+class ModelRouter:
+    """
+    Maps task priority and estimated complexity to a ladder of model tiers.
+
+    Each tier is a list of interchangeable provider/model targets. Callers
+    start at the cheapest tier allowed for the task and escalate to the next
+    one when the answer fails a confidence check. Within a tier, targets
+    whose observed p95 latency or error rate breaks the SLO are moved to the
+    back until a cooldown has passed, so traffic fails over to the alternate
+    provider.
+    """
+
+    def __init__(self, routing_config: Optional[Dict[str, Any]], default_model: str):
+        """
+        Initialize the router.
+
+        Args:
+            routing_config: The "routing" section of the agent configuration
+            default_model: Model used when no routing is configured
+        """
+        config = routing_config or {}
+        self.tiers: Dict[str, List[ModelTarget]] = {
+            name: [ModelTarget(t["provider"], t["model"]) for t in targets]
+            for name, targets in config.get("tiers", {}).items()
+        }
+        if not self.tiers:
+            self.tiers = {"default": [ModelTarget("openai", default_model)]}
+
+        tier_names = list(self.tiers)
+        self.priority_tiers: Dict[str, List[str]] = {
+            priority: config.get("priority_tiers", {}).get(priority, tier_names)
+            for priority in PRIORITIES
+        }
+        self.complex_threshold = float(config.get("complex_threshold", 0.6))
+        self.min_confidence = float(config.get("min_confidence", 0.6))
+
+        slo = config.get("slo", {})
+        self.slo_p95_seconds = float(slo.get("p95_latency_ms", 15000)) / 1000.0
+        self.slo_max_error_rate = float(slo.get("max_error_rate", 0.25))
+        self.slo_min_samples = int(slo.get("min_samples", 10))
+        self.slo_cooldown = float(slo.get("cooldown_seconds", 60))
+        self._window = int(slo.get("window", 50))
+
+        self._stats: Dict[str, _TargetStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_complexity(description: str) -> float:
+        """
+        Cheap heuristic estimate of task complexity in [0, 1].
+
+        Args:
+            description: Task description
+
+        Returns:
+            float: 0 for trivial requests, 1 for long multi-part ones
+        """
+        if not description:
+            return 0.0
+        words = len(description.split())
+        length_score = min(words / 200.0, 1.0)
+        hint_score = min(len(_COMPLEX_HINTS.findall(description)) / 3.0, 1.0)
+        parts_score = min(description.count("\n") / 10.0, 1.0)
+        return round(0.5 * length_score + 0.35 * hint_score + 0.15 * parts_score, 3)
+
+    def route(self, priority: str, complexity: float = 0.0) -> List[List[ModelTarget]]:
+        """
+        Build the escalation ladder for a call.
+
+        Args:
+            priority: Task priority (low, medium, high, highest)
+            complexity: Estimated complexity in [0, 1]
+
+        Returns:
+            List of tiers, cheapest first; each tier lists targets healthiest first
+        """
+        tier_names = self.priority_tiers.get(priority) or list(self.tiers)
+        # Complex work skips the cheapest tier when a stronger one is allowed
+        if complexity >= self.complex_threshold and len(tier_names) > 1:
+            tier_names = tier_names[1:]
+
+        now = time.monotonic()
+        ladder = []
+        for name in tier_names:
+            targets = self.tiers.get(name)
+            if not targets:
+                continue
+            # Stable sort keeps configured provider order among healthy targets
+            ladder.append(sorted(targets, key=lambda t: not self._is_healthy(t, now)))
+        return ladder
+
+    def record(self, target: ModelTarget, latency: float, success: bool) -> None:
+        """
+        Record the outcome of a call and trip the target if it breaks the SLO.
+
+        Args:
+            target: Target that served the call
+            latency: Wall-clock seconds spent on the call
+            success: Whether the call returned a usable response
+        """
+        with self._lock:
+            stats = self._stats.setdefault(target.key, _TargetStats(self._window))
+            stats.samples.append((latency, success))
+            if len(stats.samples) < self.slo_min_samples:
+                return
+
+            p95 = stats.p95_latency()
+            error_rate = stats.error_rate()
+            if (p95 is not None and p95 > self.slo_p95_seconds) or error_rate > self.slo_max_error_rate:
+                if stats.tripped_until <= time.monotonic():
+                    logger.warning(
+                        f"{target.key} breaks SLO (p95={p95}, error_rate={error_rate:.2f}), "
+                        f"failing over for {self.slo_cooldown:.0f}s"
+                    )
+                stats.tripped_until = time.monotonic() + self.slo_cooldown
+                # Start the next evaluation from fresh samples
+                stats.samples.clear()
+
+    def accepts(self, confidence: Optional[float]) -> bool:
+        """
+        Whether an answer is confident enough to stop escalating.
+
+        Answers that do not report a confidence are accepted.
+        """
+        return confidence is None or confidence >= self.min_confidence
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Snapshot of per-target latency and error statistics.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {
+                    "samples": len(stats.samples),
+                    "p95_latency": stats.p95_latency(),
+                    "error_rate": round(stats.error_rate(), 3),
+                    "healthy": stats.tripped_until <= now,
+                }
+                for key, stats in self._stats.items()
+            }
+
+    def _is_healthy(self, target: ModelTarget, now: float) -> bool:
+        stats = self._stats.get(target.key)
+        return stats is None or stats.tripped_until <= now
@@ -1,10 +1,39 @@
+import asyncio
+import functools
+import heapq
 import json
 import logging
 import os
-from typing import Dict, List, Any, Optional
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import replace
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
 
-import portkey
-from portkey.api import PortkeyClient
+from admission import AdmissionController, ProviderBudget
+from blob_store import BlobStore
+from callbacks import (
+    CALLBACK_TOKEN_HEADER,
+    CALLBACK_URL_HEADER,
+    DISPATCH_ID_HEADER,
+    CallbackQueue,
+    CallbackUpdate,
+    PendingDispatch,
+    sign_dispatch,
+)
+from hedging import HedgePolicy
+from model_router import ModelRouter, ModelTarget
+from plan_cache import PlanCache
+from react_executor import ReActExecutor, StepBudget, ToolRegistry
+from records import AgentRecord, TaskPriority, TaskRecord, TaskStatus
+import tracing
+
+if TYPE_CHECKING:
+    import httpx
+    from portkey.api import PortkeyClient
 
 # Configure logging
 logging.basicConfig(
@@ -13,6 +42,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger("OrchestratorAgent")
 
+# System prompt suffix for the task decomposition call
+PLANNING_INSTRUCTIONS = (
+    "Break the user's task into sub-tasks for the available agents. Respond "
+    'with a single JSON object {"sub_tasks": [{"id": "s1", "agent": <agent id>, '
+    '"description": <what the agent must do>, "depends_on": [<ids of earlier '
+    "sub-tasks>]}]}. Use only the listed agent ids and keep the list short."
+)
+
+# Task states that still occupy a slot in the work queue
+QUEUED_STATUSES = (TaskStatus.CREATED, TaskStatus.RUNNING)
+
+# Task states a task never leaves
+TERMINAL_STATUSES = frozenset({
+    TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED, TaskStatus.TIMED_OUT
+})
+
+# Default time allowed from creation to completion, per priority (seconds)
+DEFAULT_DEADLINES = {
+    "low": 3600,
+    "medium": 1800,
+    "high": 900,
+    "highest": 600,
+}
+
+# Header carrying the task deadline (Unix time, seconds) to agent endpoints
+DEADLINE_HEADER = "X-Task-Deadline"
+
+# Deadline of the task whose ReAct loop is running in the current context
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+# Task whose ReAct loop is running in the current context
+current_task_id: ContextVar[Optional[str]] = ContextVar("current_task_id", default=None)
+
+# Task progress status after each kind of callback update
+CALLBACK_STATUSES = {"progress": "running", "result": "completed", "error": "failed"}
+
+# Appended to the system prompt so the model answers with a parseable step
+REACT_FORMAT_INSTRUCTIONS = (
+    "Respond with a single JSON object with the keys: "
+    '"thought" (your reasoning), '
+    '"actions" (a list of {"tool": <tool name>, "input": {...}} to run next; '
+    "all actions in one list must be independent of each other because they "
+    'run concurrently), "parallel" (false if the actions must run in order), '
+    '"confidence" (0 to 1, how sure you are of this step) '
+    'and "final_answer" (null until the task is complete).'
+)
+
+# Returned by an agent request that was accepted for asynchronous completion
+_ACCEPTED = object()
+
 class OrchestratorAgent:
     """
     CEO Orchestrator Agent that coordinates all specialized agents.
@@ -27,18 +106,85 @@ class OrchestratorAgent:
             config_path: Path to agent configuration JSON file
         """
         self.config = self._load_config(config_path)
-        self.agent_registry = {}
-        self.active_tasks = {}
+        self.agent_registry: Dict[str, AgentRecord] = {}
+        self.active_tasks: Dict[str, TaskRecord] = {}
+        self.tools = ToolRegistry()
+        self.react_budget = StepBudget.from_dict(self.config.get("react_budget"))
+        self._http_client: Optional["httpx.AsyncClient"] = None
+        self._portkey_client: Optional["PortkeyClient"] = None
+        self.model_router = ModelRouter(self.config.get("routing"), self.config["model"])
+        self.hedge_policy = HedgePolicy(self.config.get("hedging"))
         
-        # Initialize Portkey client for LLM call routing and monitoring
-        portkey_api_key = os.environ.get("PORTKEY_API_KEY")
-        if not portkey_api_key:
-            logger.warning("PORTKEY_API_KEY not found in environment variables")
+        plan_cache_config = self.config.get("plan_cache", {})
+        self.plan_cache: Optional[PlanCache] = None
+        if plan_cache_config.get("enabled", True):
+            self.plan_cache = PlanCache(
+                capacity=int(plan_cache_config.get("capacity", 1000)),
+                threshold=float(plan_cache_config.get("similarity_threshold", 0.92)),
+                dim=int(plan_cache_config.get("dim", 512)),
+                usage_half_life=float(plan_cache_config.get("usage_half_life_seconds", 3600))
+            )
+        self.admission = AdmissionController(self.config.get("admission"))
+        self.provider_budget = ProviderBudget(self.config.get("provider_limits"))
+        self.provider_wait_seconds = float(self.config.get("provider_wait_seconds", 10))
+        # Updated from threadpool workers (sync endpoints) and the event loop
+        self._status_counts: Counter = Counter()
+        self._status_lock = threading.Lock()
+        self.blob_store = BlobStore(self.config.get("blob_store_path"))
+        self.deadlines = {**DEFAULT_DEADLINES, **self.config.get("deadlines", {})}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._deadline_heap: List[tuple] = []
+        
+        callback_config = self.config.get("callbacks", {})
+        self.callback_url: Optional[str] = None
+        if callback_config.get("enabled", True):
+            self.callback_url = os.environ.get("ORCHESTRATOR_CALLBACK_URL") or callback_config.get("url")
+        self.callback_wait_seconds = float(callback_config.get("wait_seconds", 3600))
+        self.callback_inline_bytes = int(callback_config.get("max_inline_progress_bytes", 4096))
+        self.callbacks = CallbackQueue(callback_config)
+        self._dispatches: Dict[str, PendingDispatch] = {}
+        self.callbacks_applied = 0
+        self.callbacks_ignored = 0
         
-        self.portkey_client = PortkeyClient(api_key=portkey_api_key)
+        if not os.environ.get("PORTKEY_API_KEY"):
+            logger.warning("PORTKEY_API_KEY not found in environment variables")
         
         logger.info(f"Orchestrator Agent initialized with config: {self.config['name']}")
     
+    @property
+    def portkey_client(self) -> "PortkeyClient":
+        """
+        Portkey client for LLM call routing and monitoring.
+        
+        Imported and constructed on first use so that requests which never
+        reach an LLM do not pay for the SDK import.
+        """
+        if self._portkey_client is None:
+            from portkey.api import PortkeyClient
+            
+            self._portkey_client = PortkeyClient(api_key=os.environ.get("PORTKEY_API_KEY"))
+        return self._portkey_client
+    
+    @property
+    def http_client(self) -> "httpx.AsyncClient":
+        """
+        Shared HTTP client for agent calls, created on first use.
+        """
+        if self._http_client is None:
+            import httpx
+            
+            self._http_client = httpx.AsyncClient(timeout=60.0)
+        return self._http_client
+    
+    async def aclose(self) -> None:
+        """
+        Release network clients created during the orchestrator's lifetime.
+        """
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
     def _load_config(self, config_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Load agent configuration from JSON file.
@@ -84,8 +230,16 @@ class OrchestratorAgent:
         if agent_id in self.agent_registry:
             logger.warning(f"Agent {agent_id} already registered, updating information")
         
-        self.agent_registry[agent_id] = agent_info
-        logger.info(f"Agent {agent_id} registered: {agent_info['name']}")
+        agent = AgentRecord.from_dict(agent_info)
+        self.agent_registry[agent_id] = agent
+        self.tools.register(
+            agent_id,
+            # A partial of a coroutine function, so the registry awaits it
+            # directly instead of creating the coroutine in a worker thread
+            functools.partial(self._dispatch_to_agent, agent_id),
+            agent.description or agent.name,
+        )
+        logger.info(f"Agent {agent_id} registered: {agent.name}")
         return True
     
     def unregister_agent(self, agent_id: str) -> bool:
@@ -103,6 +257,7 @@ class OrchestratorAgent:
             return False
         
         del self.agent_registry[agent_id]
+        self.tools.unregister(agent_id)
         logger.info(f"Agent {agent_id} unregistered")
         return True
     
@@ -114,17 +269,26 @@ class OrchestratorAgent:
             List of agent information dictionaries
         """
         return [
-            {"id": agent_id, **agent_info}
-            for agent_id, agent_info in self.agent_registry.items()
+            {"id": agent_id, **agent.to_dict()}
+            for agent_id, agent in self.agent_registry.items()
         ]
     
-    def create_task(self, task_description: str, priority: str = "medium") -> str:
+    def create_task(
+        self,
+        task_description: str,
+        priority: str = "medium",
+        budget: Optional[Dict[str, Any]] = None,
+        deadline_seconds: Optional[float] = None
+    ) -> str:
         """
         Create a new task and plan its execution.
         
         Args:
             task_description: Description of the task
             priority: Task priority (low, medium, high, highest)
+            budget: Optional overrides for the ReAct step budget
+            deadline_seconds: Time allowed from now until the task must be
+                finished; defaults to the deadline for its priority
             
         Returns:
             str: Task ID
@@ -135,19 +299,123 @@ class OrchestratorAgent:
         # 3. Creating a dependency graph for execution
         # 4. Scheduling the task for execution
         
-        # This is a placeholder implementation
-        import uuid
-        task_id = str(uuid.uuid4())
+        with tracing.start_span("create_task", {"task.priority": priority}) as span:
+            task_id = str(uuid.uuid4())
+            span.set_attribute("task.id", task_id)
+            
+            if deadline_seconds is None:
+                deadline_seconds = self.deadlines.get(priority, DEFAULT_DEADLINES["medium"])
+            now = time.time()
+            deadline = now + deadline_seconds
+            
+            task = TaskRecord(
+                description=task_description,
+                priority=TaskPriority(priority),
+                created_at=now,
+                deadline=deadline,
+                # Tasks without overrides share the default budget object
+                budget=self.react_budget.merged(budget) if budget else self.react_budget,
+                trace_parent=span.context.traceparent
+            )
+            self.active_tasks[task_id] = task
+            with self._status_lock:
+                self._status_counts[TaskStatus.CREATED] += 1
+            heapq.heappush(self._deadline_heap, (deadline, task_id))
+            
+            task.sub_tasks, task.plan_source = self._plan_task(task_description, task.priority)
+            span.set_attribute("plan.source", task.plan_source)
+            
+            logger.info(f"Task created: {task_id} - {task_description}")
+        return task_id
+    
+    def _plan_task(self, task_description: str, priority: str) -> tuple:
+        """
+        Break a task into sub-tasks, reusing a cached plan when possible.
         
-        self.active_tasks[task_id] = {
-            "description": task_description,
-            "priority": priority,
-            "status": "created",
-            "sub_tasks": [],
-        }
+        Args:
+            task_description: Description of the task
+            priority: Task priority
+            
+        Returns:
+            Tuple of (sub-task list, plan source: "cache", "planner" or "none")
+        """
+        if not self.agent_registry:
+            return [], "none"
         
-        logger.info(f"Task created: {task_id} - {task_description}")
-        return task_id
+        with tracing.start_span("plan_task") as span:
+            if self.plan_cache is not None:
+                cached = self.plan_cache.lookup(task_description)
+                if cached is not None and self._validate_plan(cached):
+                    span.set_attribute("plan.cache_hit", True)
+                    logger.info(f"Reusing cached plan with {len(cached)} sub-tasks")
+                    return cached, "cache"
+            
+            span.set_attribute("plan.cache_hit", False)
+            plan = self._generate_plan(task_description, priority)
+            if not self._validate_plan(plan):
+                logger.warning("Planner returned an invalid plan, continuing without sub-tasks")
+                return [], "none"
+            
+            if self.plan_cache is not None:
+                self.plan_cache.store(task_description, plan)
+            return plan, "planner"
+    
+    def _generate_plan(self, task_description: str, priority: str) -> List[Dict[str, Any]]:
+        """
+        Ask the LLM to decompose a task into sub-tasks.
+        
+        Args:
+            task_description: Description of the task
+            priority: Task priority, used for model routing
+            
+        Returns:
+            List of sub-task dicts, empty if planning failed
+        """
+        messages = [
+            {"role": "system", "content": f"{self.config['system_prompt']}\n\n{PLANNING_INSTRUCTIONS}"},
+            {"role": "user", "content": json.dumps({
+                "task": task_description,
+                "agents": self.tools.describe()
+            }, indent=2)}
+        ]
+        max_tokens = self.config["max_tokens"]
+        reserved_tokens = sum(len(m["content"]) for m in messages) // 4 + max_tokens
+        complexity = self.model_router.estimate_complexity(task_description)
+        
+        for tier in self.model_router.route(priority, complexity):
+            for target in tier:
+                try:
+                    _, response = self._call_llm(target, messages, max_tokens, reserved_tokens)
+                except Exception as e:
+                    logger.warning(f"Planning call to {target.key} failed: {str(e)}")
+                    continue
+                
+                parsed = self._parse_json_object(response.choices[0].message.content)
+                return (parsed or {}).get("sub_tasks") or []
+        return []
+    
+    def _validate_plan(self, plan: Any) -> bool:
+        """
+        Check that a plan only uses registered agents and earlier dependencies.
+        
+        Args:
+            plan: Candidate list of sub-tasks
+            
+        Returns:
+            bool: Whether the plan can be executed
+        """
+        if not isinstance(plan, list) or not plan:
+            return False
+        seen = set()
+        for sub_task in plan:
+            if not isinstance(sub_task, dict):
+                return False
+            if sub_task.get("agent") not in self.agent_registry or not sub_task.get("id"):
+                return False
+            if any(dep not in seen for dep in sub_task.get("depends_on", [])):
+                return False
+            seen.add(sub_task["id"])
+        return True
     
     def execute_task(self, task_id: str) -> bool:
         """
@@ -163,8 +431,11 @@ class OrchestratorAgent:
             logger.error(f"Task {task_id} not found")
             return False
         
-        task = self.active_tasks[task_id]
-        task["status"] = "running"
+        if self.active_tasks[task_id].status != TaskStatus.CREATED:
+            logger.error(f"Task {task_id} cannot be executed in state {self.active_tasks[task_id].status}")
+            return False
+        
+        self._set_task_status(task_id, TaskStatus.RUNNING)
         
         # Placeholder for task execution logic
         # In the real implementation, this would:
@@ -175,6 +446,242 @@ class OrchestratorAgent:
         logger.info(f"Task {task_id} execution started")
         return True
     
+    def _set_task_status(self, task_id: str, status: TaskStatus) -> None:
+        """
+        Update a task's status and the per-status counters.
+        
+        Args:
+            task_id: Unique identifier for the task
+            status: New status
+        """
+        task = self.active_tasks[task_id]
+        with self._status_lock:
+            self._status_counts[task.status] -= 1
+            self._status_counts[status] += 1
+            task.status = status
+    
+    def queue_depth(self) -> int:
+        """
+        Number of tasks that are created or running.
+        
+        Returns:
+            int: Current queue depth used for backpressure
+        """
+        with self._status_lock:
+            return sum(self._status_counts[status] for status in QUEUED_STATUSES)
+    
+    def start_task(self, task_id: str) -> "asyncio.Task":
+        """
+        Schedule the ReAct loop of a task on the running event loop.
+        
+        The loop is bounded by the task deadline and can be stopped with
+        cancel_task().
+        
+        Args:
+            task_id: Unique identifier for the task
+            
+        Returns:
+            The asyncio task running the loop
+        """
+        self._cancel_events[task_id] = threading.Event()
+        runner = asyncio.create_task(self._run_with_deadline(task_id))
+        self._running[task_id] = runner
+        runner.add_done_callback(lambda _: self._running.pop(task_id, None))
+        return runner
+    
+    async def _run_with_deadline(self, task_id: str) -> None:
+        task = self.active_tasks[task_id]
+        token = current_deadline.set(task.deadline)
+        task_token = current_task_id.set(task_id)
+        parent = tracing.parse_traceparent(task.trace_parent)
+        
+        # Time between creation and the start of execution
+        with tracing.start_span(
+            "task.queued",
+            {"task.id": task_id},
+            parent=parent,
+            start_ns=int(task.created_at * 1e9)
+        ):
+            pass
+        
+        try:
+            with tracing.start_span(
+                "execute_task",
+                {"task.id": task_id, "task.priority": task.priority.value},
+                parent=parent
+            ) as span:
+                try:
+                    await asyncio.wait_for(
+                        self.run_react_loop(task_id),
+                        timeout=max(0.0, task.deadline - time.time())
+                    )
+                finally:
+                    span.set_attribute("task.status", task.status.value)
+        except asyncio.TimeoutError:
+            logger.warning(f"Task {task_id} exceeded its deadline")
+            self._finish_task(task_id, TaskStatus.TIMED_OUT)
+        except asyncio.CancelledError:
+            self._finish_task(task_id, TaskStatus.CANCELLED)
+        finally:
+            current_deadline.reset(token)
+            current_task_id.reset(task_token)
+            event = self._cancel_events.pop(task_id, None)
+            if event is not None:
+                # Stop any LLM call still running in a worker thread from
+                # escalating or failing over any further
+                event.set()
+    
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        Cancel a task and all of its outstanding agent and LLM calls.
+        
+        Args:
+            task_id: Unique identifier for the task
+            
+        Returns:
+            bool: False if the task does not exist or has already finished
+        """
+        task = self.active_tasks.get(task_id)
+        if task is None or task.status in TERMINAL_STATUSES:
+            return False
+        
+        event = self._cancel_events.get(task_id)
+        if event is not None:
+            event.set()
+        runner = self._running.get(task_id)
+        if runner is not None:
+            runner.cancel()
+        self._finish_task(task_id, TaskStatus.CANCELLED)
+        logger.info(f"Task {task_id} cancelled")
+        return True
+    
+    def _finish_task(self, task_id: str, status: TaskStatus) -> None:
+        """
+        Move a task into a terminal state unless it is already in one.
+        """
+        if self.active_tasks[task_id].status not in TERMINAL_STATUSES:
+            self._set_task_status(task_id, status)
+    
+    def expire_overdue_tasks(self) -> int:
+        """
+        Time out every unfinished task whose deadline has passed.
+        
+        Returns:
+            int: Number of tasks that were timed out
+        """
+        now = time.time()
+        expired = 0
+        while self._deadline_heap and self._deadline_heap[0][0] <= now:
+            _, task_id = heapq.heappop(self._deadline_heap)
+            task = self.active_tasks.get(task_id)
+            if task is None or task.status in TERMINAL_STATUSES:
+                continue
+            runner = self._running.get(task_id)
+            if runner is not None:
+                runner.cancel()
+            self._set_task_status(task_id, TaskStatus.TIMED_OUT)
+            expired += 1
+        if expired:
+            logger.warning(f"Timed out {expired} overdue tasks")
+        return expired
+    
+    async def run_deadline_reaper(self, interval: float = 1.0) -> None:
+        """
+        Periodically time out overdue tasks, including ones never executed.
+        
+        Args:
+            interval: Seconds between sweeps
+        """
+        while True:
+            self.expire_overdue_tasks()
+            await asyncio.sleep(interval)
+    
+    async def submit_callback(self, dispatch_id: str, seq: int, kind: str, data: Any = None) -> None:
+        """
+        Queue an agent callback for the batch applier.
+        
+        Progress payloads larger than callbacks.max_inline_progress_bytes
+        are written to the blob store first, so task status stays small and
+        only a reference is kept in the task record.
+        
+        Raises:
+            CallbackQueueFull: If the ingestion queue is at capacity
+        """
+        data_ref = None
+        if kind == "progress" and data is not None:
+            encoded = json.dumps(data)
+            if len(encoded) > self.callback_inline_bytes:
+                blob = await asyncio.to_thread(self.blob_store.put, encoded)
+                data, data_ref = None, {
+                    "name": f"progress-{dispatch_id}.json",
+                    "content_type": "application/json",
+                    **blob,
+                }
+        self.callbacks.submit(CallbackUpdate(dispatch_id, seq, kind, data, data_ref))
+    
+    def apply_callback_updates(self, updates: List[CallbackUpdate]) -> int:
+        """
+        Apply a batch of agent callbacks to dispatch and task state.
+        
+        Updates are idempotent: a dispatch completes on its first result or
+        error and ignores everything after it, and a progress update only
+        applies if its sequence number is higher than any applied before, so
+        duplicates and reordered deliveries change nothing. Updates for
+        unknown dispatches (finished, cancelled or never issued) are dropped.
+        
+        Args:
+            updates: Updates in arrival order
+            
+        Returns:
+            int: Number of updates applied
+        """
+        applied = 0
+        # Within a batch, apply each dispatch's updates in sequence order
+        for update in sorted(updates, key=lambda u: u.seq):
+            dispatch = self._dispatches.get(update.dispatch_id)
+            if dispatch is None or dispatch.done or (
+                update.kind == "progress" and update.seq <= dispatch.last_seq
+            ):
+                self.callbacks_ignored += 1
+                continue
+            
+            dispatch.last_seq = max(dispatch.last_seq, update.seq)
+            if update.kind != "progress":
+                dispatch.done = True
+                if not dispatch.future.done():
+                    dispatch.future.set_result(
+                        update.data if update.kind == "result" else {"error": update.data}
+                    )
+            
+            task = self.active_tasks.get(dispatch.task_id) if dispatch.task_id else None
+            if task is not None:
+                if task.progress is None:
+                    task.progress = {}
+                task.progress[update.dispatch_id] = {
+                    "agent": dispatch.agent_id,
+                    "status": CALLBACK_STATUSES[update.kind],
+                    "seq": update.seq,
+                    # Results are returned to the ReAct loop and stored with
+                    # the task result; only progress payloads are kept here
+                    "data": update.data if update.kind == "progress" else None,
+                    "data_ref": update.data_ref,
+                    "updated_at": update.received_at,
+                }
+                if update.data_ref is not None:
+                    # Served through the artifacts endpoint; only the latest
+                    # large payload per dispatch is kept
+                    task.replace_artifact(update.data_ref)
+            applied += 1
+        
+        self.callbacks_applied += applied
+        return applied
+    
+    async def run_callback_applier(self) -> None:
+        """
+        Apply queued agent callbacks in batches until cancelled.
+        """
+        await self.callbacks.run(self.apply_callback_updates)
+    
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """
         Get the current status of a task.
@@ -189,58 +696,460 @@ class OrchestratorAgent:
             logger.error(f"Task {task_id} not found")
             return {"error": "Task not found"}
         
-        return self.active_tasks[task_id]
+        return self.active_tasks[task_id].to_dict()
     
-    def think_action_observation(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    def think_action_observation(
+        self,
+        context: Dict[str, Any],
+        max_tokens: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
         """
-        Implement the ReAct (Reasoning and Action) pattern.
+        Implement one step of the ReAct (Reasoning and Action) pattern.
         
         Args:
-            context: Current context including task information
+            context: Current context including task information and the
+                observations of previous steps
+            max_tokens: Optional cap on completion tokens for this step
+            cancel_event: When set, no further models are tried for this step
             
         Returns:
-            Dict containing thought, action, and observation
+            Dict containing thought, actions, final_answer, the model that
+            answered and token usage
         """
-        # This method will use Portkey to route to the appropriate LLM
-        # and implement the Thought → Action → Observation loop
-        
-        # Format the prompt with the system instructions and context
-        system_prompt = self.config["system_prompt"]
-        user_prompt = json.dumps(context, indent=2)
-        
-        try:
-            # Call the LLM through Portkey (with built-in retries and monitoring)
-            response = self.portkey_client.chat(
-                messages=[
+        with tracing.start_span(
+            "think_action_observation",
+            {"react.step": context.get("step", 0)}
+        ) as span:
+            # Format the prompt with the system instructions and context
+            system_prompt = f"{self.config['system_prompt']}\n\n{REACT_FORMAT_INSTRUCTIONS}"
+            user_prompt = json.dumps(context, indent=2)
+            
+            if max_tokens is None:
+                max_tokens = self.config["max_tokens"]
+            else:
+                max_tokens = min(max_tokens, self.config["max_tokens"])
+            
+            task = context.get("task", {})
+            priority = task.get("priority", "medium")
+            complexity = self.model_router.estimate_complexity(task.get("description", ""))
+            
+            try:
+                result = None
+                last_error = None
+                total_tokens = 0
+                
+                # Walk the tiers cheapest first, escalating on low confidence; within
+                # a tier, fail over to the next provider when a call errors
+                ladder = self.model_router.route(priority, complexity)
+                last_target = ladder[-1][-1] if ladder else None
+                
+                # Worst-case reservation against the shared provider budget; only
+                # the last candidate waits for budget, the others fail over at once
+                reserved_tokens = (len(system_prompt) + len(user_prompt)) // 4 + max_tokens
+                
+                messages = [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
-                ],
-                model=self.config["model"],
-                temperature=self.config["temperature"],
-                max_tokens=self.config["max_tokens"],
-                virtual_keys={"provider": "openai"}
-            )
+                ]
+                
+                for tier_index, tier in enumerate(ladder):
+                    tier_result = None
+                    for target in tier:
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise RuntimeError("Task cancelled")
+                        
+                        wait = self.provider_wait_seconds if target is last_target else 0.0
+                        # A slow call may be hedged to the next provider of the tier
+                        backup = next((t for t in tier if t is not target), None)
+                        try:
+                            served_by, response = self.hedge_policy.call_sync(
+                                f"llm:{target.key}",
+                                lambda t=target: self._call_llm(t, messages, max_tokens, reserved_tokens, wait),
+                                (lambda t=backup: self._call_llm(t, messages, max_tokens, reserved_tokens))
+                                if backup is not None else None
+                            )
+                        except Exception as e:
+                            logger.warning(f"LLM call to {target.key} failed: {str(e)}")
+                            last_error = e
+                            continue
+                        
+                        usage = getattr(response, "usage", None)
+                        total_tokens += getattr(usage, "total_tokens", 0) or 0
+                        
+                        tier_result = self._parse_react_response(response.choices[0].message.content)
+                        tier_result["model"] = served_by.key
+                        break
+                    
+                    if tier_result is None:
+                        continue
+                    
+                    result = tier_result
+                    if self.model_router.accepts(result.get("confidence")):
+                        break
+                    if tier_index < len(ladder) - 1:
+                        logger.info(
+                            f"Escalating from {result['model']} "
+                            f"(confidence {result.get('confidence')})"
+                        )
+                
+                if result is None:
+                    raise last_error or RuntimeError("No model available for routing")
+                
+                result["usage"] = {"total_tokens": total_tokens}
+                span.set_attribute("llm.model", result["model"])
+                span.set_attribute("llm.total_tokens", total_tokens)
+                return result
             
-            # Parse the response to extract thought, action, observation
-            response_text = response.choices[0].message.content
+            except Exception as e:
+                logger.error(f"Error in think_action_observation: {str(e)}")
+                span.record_error(e)
+                return {
+                    "thought": "Error occurred during processing",
+                    "action": "Log error",
+                    "observation": f"Exception: {str(e)}",
+                    "actions": [],
+                    "final_answer": None,
+                    "error": str(e),
+                    "usage": {"total_tokens": 0}
+                }
+    
+    def _call_llm(
+        self,
+        target: ModelTarget,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        reserved_tokens: int,
+        budget_wait: float = 0.0
+    ) -> tuple:
+        """
+        Make one chat completion call against a routing target.
+        
+        Reserves the call against the shared provider budget and records the
+        outcome for the router's SLO tracking.
+        
+        Args:
+            target: Provider/model to call
+            messages: Chat messages
+            max_tokens: Completion token cap
+            reserved_tokens: Worst-case tokens to reserve from the provider budget
+            budget_wait: Seconds to wait for provider budget
             
-            # Placeholder for parsing logic - in real implementation,
-            # this would parse structured output from the LLM
-            result = {
-                "thought": "Analyzing task requirements...",
-                "action": "Delegate to specialized agent",
-                "observation": "Task assigned successfully"
-            }
+        Returns:
+            Tuple of (target, response)
+        """
+        if not self.provider_budget.acquire(target.provider, reserved_tokens, budget_wait):
+            raise RuntimeError(f"Provider budget exhausted for {target.provider}")
+        
+        with tracing.start_span(
+            "llm.call",
+            {"llm.provider": target.provider, "llm.model": target.model},
+            kind=tracing.KIND_CLIENT
+        ) as span:
+            started = time.monotonic()
+            try:
+                # Call the LLM through Portkey (with built-in retries and monitoring)
+                response = self.portkey_client.chat(
+                    messages=messages,
+                    model=target.model,
+                    temperature=self.config["temperature"],
+                    max_tokens=max_tokens,
+                    virtual_keys={"provider": target.provider}
+                )
+            except Exception:
+                self.model_router.record(target, time.monotonic() - started, False)
+                self.provider_budget.settle(target.provider, reserved_tokens, 0)
+                raise
             
-            return result
+            self.model_router.record(target, time.monotonic() - started, True)
+            usage = getattr(response, "usage", None)
+            used_tokens = getattr(usage, "total_tokens", 0) or reserved_tokens
+            self.provider_budget.settle(target.provider, reserved_tokens, used_tokens)
+            span.set_attribute("llm.total_tokens", used_tokens)
+            return target, response
+    
+    @staticmethod
+    def _parse_json_object(response_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a completion that should be a JSON object, tolerating code fences.
+        
+        Args:
+            response_text: Raw completion text
             
-        except Exception as e:
-            logger.error(f"Error in think_action_observation: {str(e)}")
+        Returns:
+            The parsed object, or None if the text is not a JSON object
+        """
+        text = (response_text or "").strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            if text.startswith("json"):
+                text = text[len("json"):]
+        
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+    
+    def _parse_react_response(self, response_text: str) -> Dict[str, Any]:
+        """
+        Parse the model's structured ReAct step.
+        
+        Args:
+            response_text: Raw completion text
+            
+        Returns:
+            Dict containing thought, actions, parallel, confidence and
+            final_answer. Text that is not a JSON object is treated as a
+            final answer with zero confidence.
+        """
+        parsed = self._parse_json_object(response_text)
+        if parsed is None:
             return {
-                "thought": "Error occurred during processing",
-                "action": "Log error",
-                "observation": f"Exception: {str(e)}"
+                "thought": None,
+                "action": None,
+                "actions": [],
+                "parallel": True,
+                "confidence": 0.0,
+                "final_answer": response_text
             }
+        
+        try:
+            confidence = float(parsed["confidence"])
+        except (KeyError, TypeError, ValueError):
+            confidence = None
+        
+        actions = [
+            action for action in parsed.get("actions") or []
+            if isinstance(action, dict) and action.get("tool")
+        ]
+        return {
+            "thought": parsed.get("thought"),
+            "action": ", ".join(action["tool"] for action in actions) or None,
+            "actions": actions,
+            "parallel": bool(parsed.get("parallel", True)),
+            "confidence": confidence,
+            "final_answer": parsed.get("final_answer")
+        }
+    
+    async def run_react_loop(self, task_id: str) -> Dict[str, Any]:
+        """
+        Run the iterative ReAct loop for a task within its step budget.
+        
+        Independent actions of a step are dispatched concurrently, and their
+        observations are fed back into the next step.
+        
+        Args:
+            task_id: Unique identifier for the task
+            
+        Returns:
+            Dict containing the loop result (status, final_answer, steps, usage)
+        """
+        if task_id not in self.active_tasks:
+            logger.error(f"Task {task_id} not found")
+            return {"error": "Task not found"}
+        
+        task = self.active_tasks[task_id]
+        budget = replace(task.budget)
+        
+        # Never plan beyond the task deadline
+        remaining = task.deadline - time.time()
+        if budget.max_seconds <= 0 or budget.max_seconds > remaining:
+            budget.max_seconds = max(remaining, 0.001)
+        
+        cancel_event = self._cancel_events.get(task_id)
+        
+        async def think(context: Dict[str, Any]) -> Dict[str, Any]:
+            remaining_tokens = context["budget_remaining"]["tokens"]
+            return await asyncio.to_thread(
+                self.think_action_observation, context, remaining_tokens, cancel_event
+            )
+        
+        executor = ReActExecutor(
+            think,
+            self.tools,
+            max_parallel_actions=self.config.get("max_parallel_actions", 8)
+        )
+        
+        if task.status == TaskStatus.CREATED:
+            self._set_task_status(task_id, TaskStatus.RUNNING)
+        try:
+            result = await executor.run(
+                {
+                    "task_id": task_id,
+                    "description": task.description,
+                    "priority": task.priority.value,
+                    "plan": list(task.sub_tasks)
+                },
+                budget
+            )
+        except Exception as e:
+            logger.error(f"ReAct loop failed for task {task_id}: {str(e)}")
+            self._finish_task(task_id, TaskStatus.FAILED)
+            task.error = str(e)
+            return {"error": str(e)}
+        
+        if result["stop_reason"] == "max_seconds" and time.time() >= task.deadline:
+            final_status = TaskStatus.TIMED_OUT
+        elif result["status"] == "completed":
+            final_status = TaskStatus.COMPLETED
+        else:
+            final_status = TaskStatus.FAILED
+        if result.get("error"):
+            task.error = result["error"]
+        self._finish_task(task_id, final_status)
+        
+        # A reused plan that led to failure should not be served again
+        if final_status == TaskStatus.FAILED and task.plan_source == "cache" and self.plan_cache is not None:
+            self.plan_cache.invalidate(task.description)
+        # Keep only a summary in the task record; the full trace goes to the
+        # blob store and is served through the artifacts endpoint
+        with tracing.start_span("serialise_result", {"task.id": task_id}) as span:
+            # Serialising and hashing a multi-megabyte result would stall
+            # the event loop, so both run in a worker thread
+            result_ref = await self.store_task_artifact(
+                task_id, await asyncio.to_thread(json.dumps, result), "result.json", "application/json"
+            )
+            span.set_attribute("result.size", result_ref["size"])
+        task.result = {
+            "status": result["status"],
+            "stop_reason": result["stop_reason"],
+            "usage": result["usage"],
+            **result_ref,
+        }
+        return result
+    
+    async def store_task_artifact(
+        self,
+        task_id: str,
+        data: Any,
+        name: str,
+        content_type: str = "application/octet-stream"
+    ) -> Dict[str, Any]:
+        """
+        Store an output or artifact of a task in the blob store.
+        
+        The content is hashed and written in a worker thread.
+        
+        Args:
+            task_id: Unique identifier for the task
+            data: Content as bytes or str
+            name: File name the artifact is offered under
+            content_type: MIME type of the content
+            
+        Returns:
+            Dict containing the artifact reference (name, digest, size, content_type)
+        """
+        ref = {
+            "name": name,
+            "content_type": content_type,
+            **(await asyncio.to_thread(self.blob_store.put, data)),
+        }
+        self.active_tasks[task_id].add_artifact(ref)
+        return ref
+    
+    def get_task_artifact(self, task_id: str, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an artifact reference owned by a task.
+        
+        Args:
+            task_id: Unique identifier for the task
+            digest: Blob digest of the artifact
+            
+        Returns:
+            The artifact reference, or None if the task has no such artifact
+        """
+        task = self.active_tasks.get(task_id)
+        if task is None:
+            return None
+        for artifact in task.artifacts:
+            if artifact["digest"] == digest:
+                return artifact
+        return None
+    
+    async def _dispatch_to_agent(self, agent_id: str, tool_input: Dict[str, Any]) -> Any:
+        """
+        Send an action to a registered agent's endpoint.
+        
+        Args:
+            agent_id: Unique identifier for the agent
+            tool_input: Action input forwarded as the JSON request body
+            
+        Returns:
+            The agent's JSON response
+        """
+        agent = self.agent_registry.get(agent_id)
+        if agent is None:
+            return {"error": f"Agent {agent_id} not found"}
+        
+        # Propagate the task deadline so the agent can abandon work early,
+        # and never wait on the agent past it ourselves
+        request_kwargs: Dict[str, Any] = {"json": tool_input}
+        deadline = current_deadline.get()
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return {"error": "Task deadline exceeded"}
+            request_kwargs["headers"] = {DEADLINE_HEADER: f"{deadline:.3f}"}
+            request_kwargs["timeout"] = min(remaining, 60.0)
+        
+        # Agents may accept the work with 202 and report progress and the
+        # result to /callbacks instead of holding the connection open
+        dispatch_id = None
+        if self.callback_url:
+            dispatch_id = uuid.uuid4().hex
+            request_kwargs["headers"] = {
+                **request_kwargs.get("headers", {}),
+                CALLBACK_URL_HEADER: self.callback_url,
+                CALLBACK_TOKEN_HEADER: sign_dispatch(dispatch_id),
+                DISPATCH_ID_HEADER: dispatch_id,
+            }
+            # Registered before sending, so a callback that beats the 202
+            # response is not lost
+            self._dispatches[dispatch_id] = PendingDispatch(
+                current_task_id.get(), agent_id, asyncio.get_running_loop().create_future()
+            )
+        
+        async def post(endpoint: str) -> Any:
+            with tracing.start_span(
+                "agent.request",
+                {"agent.id": agent_id, "http.url": endpoint},
+                kind=tracing.KIND_CLIENT
+            ) as span:
+                headers = tracing.inject(dict(request_kwargs.get("headers", {})))
+                response = await self.http_client.post(
+                    endpoint, **{**request_kwargs, "headers": headers}
+                )
+                span.set_attribute("http.status_code", response.status_code)
+                response.raise_for_status()
+                if response.status_code == 202 and dispatch_id:
+                    return _ACCEPTED
+                return response.json()
+        
+        # Slow calls are hedged to a replica, when the agent has any. A hedged
+        # duplicate carries the same dispatch id, so only one result counts.
+        backup = random.choice(agent.replicas) if agent.replicas else None
+        try:
+            with tracing.start_span("agent.call", {"agent.id": agent_id}) as span:
+                result = await self.hedge_policy.call(
+                    f"agent:{agent_id}",
+                    lambda: post(agent.endpoint),
+                    (lambda: post(backup)) if backup else None
+                )
+                if result is not _ACCEPTED:
+                    return result
+                
+                span.set_attribute("agent.callback", True)
+                timeout = self.callback_wait_seconds
+                if deadline is not None:
+                    timeout = min(timeout, max(0.0, deadline - time.time()))
+                try:
+                    return await asyncio.wait_for(self._dispatches[dispatch_id].future, timeout)
+                except asyncio.TimeoutError:
+                    return {"error": f"No result from agent {agent_id} within {timeout:g}s"}
+        finally:
+            if dispatch_id:
+                self._dispatches.pop(dispatch_id, None)
 
 
 if __name__ == "__main__":
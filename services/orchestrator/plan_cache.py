@@ -0,0 +1,275 @@
+import logging
+import re
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("PlanCache")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Values that vary between otherwise identical requests: URLs, e-mail
+# addresses, quoted strings and numbers (in that order of precedence).
+# Quoted strings are captured without their quotes, which plans rarely repeat
+_PARAM_RE = re.compile(
+    r"https?://\S+"
+    r"|[\w.+-]+@[\w-]+\.[\w.-]+"
+    r"|\"(?P<dq>[^\"]+)\"|'(?P<sq>[^']+)'"
+    r"|\b\d+(?:\.\d+)?\b"
+)
+
+# Placeholder for the i-th parameter in a stored plan template
+_MARKER_RE = re.compile("\x00(\\d+)\x00")
+
+
+def extract_parameters(text: str) -> List[str]:
+    """
+    Values in a task description that a cached plan should be adapted to.
+    """
+    return [match.group("dq") or match.group("sq") or match.group(0) for match in _PARAM_RE.finditer(text or "")]
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedder using signed feature hashing.
+
+    Words and word bigrams are hashed into ``dim`` buckets and the vector is
+    L2-normalised, so the dot product of two embeddings is their cosine
+    similarity. Parameter values are dropped first so that requests which
+    differ only in numbers, names in quotes or URLs embed identically.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD_RE.findall(_PARAM_RE.sub(" ", text or "").lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class PlanCache:
+    """
+    Semantic cache of validated sub-task plans keyed by task description.
+
+    Embeddings live in a preallocated NumPy matrix, so a lookup (or a batch of
+    lookups) is a single matrix product. A hit requires cosine similarity at
+    or above ``threshold`` and the same number of parameters as the cached
+    request; the cached plan is then returned with the new parameter values
+    substituted. A plan that does not mention every parameter of its request
+    cannot be adapted, so it is only served for exactly the same parameter
+    values. When full, the entry with the lowest usage score (hits decayed
+    by time since last use) is evicted.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        threshold: float = 0.92,
+        embedder: Optional[Callable[[Sequence[str]], np.ndarray]] = None,
+        dim: int = 512,
+        usage_half_life: float = 3600.0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            capacity: Maximum number of cached plans
+            threshold: Minimum cosine similarity for a hit
+            embedder: Callable mapping a list of texts to L2-normalised vectors
+            dim: Embedding dimension (must match the embedder's output)
+            usage_half_life: Seconds after which an unused entry's hit count
+                counts half for eviction
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.embed = embedder or HashingEmbedder(dim)
+        self.usage_half_life = usage_half_life
+
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._occupied = np.zeros(capacity, dtype=bool)
+        self._hits = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hit_count = 0
+
+    def __len__(self) -> int:
+        return int(self._occupied.sum())
+
+    def lookup(self, description: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find a reusable plan for a task description.
+
+        Returns:
+            The adapted plan, or None on a miss
+        """
+        return self.lookup_many([description])[0]
+
+    def lookup_many(self, descriptions: Sequence[str]) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Batched lookup: one matrix product for all descriptions.
+
+        Returns:
+            One adapted plan (or None) per description
+        """
+        if not descriptions:
+            return []
+        queries = self.embed(descriptions)
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(descriptions)
+
+        with self._lock:
+            self.lookups += len(descriptions)
+            if not self._occupied.any():
+                return results
+
+            scores = queries @ self._vectors.T
+            scores[:, ~self._occupied] = -np.inf
+            # Candidates in descending similarity, so a parameter mismatch on
+            # the best match can fall back to the next one above threshold
+            order = np.argsort(-scores, axis=1)
+            now = time.time()
+            for row, description in enumerate(descriptions):
+                params = extract_parameters(description)
+                for slot in order[row]:
+                    if scores[row, slot] < self.threshold:
+                        break
+                    entry = self._entries[slot]
+                    if len(entry["params"]) != len(params):
+                        continue
+                    if entry["exact"] and entry["params"] != params:
+                        continue
+                    self._hits[slot] += 1
+                    self._last_used[slot] = now
+                    self.hit_count += 1
+                    results[row] = _fill_template(entry["template"], params)
+                    break
+        return results
+
+    def store(self, description: str, plan: List[Dict[str, Any]]) -> None:
+        """
+        Cache a validated plan for a task description.
+
+        Parameter values of the description that appear in the plan are
+        replaced by placeholders so the plan can be adapted on reuse. If any
+        parameter has no placeholder, the entry only matches requests with
+        the same parameter values.
+        """
+        params = extract_parameters(description)
+        template, templated = _make_template(plan, params)
+        vector = self.embed([description])[0]
+
+        with self._lock:
+            free = np.flatnonzero(~self._occupied)
+            if free.size:
+                slot = int(free[0])
+            else:
+                slot = self._eviction_candidate()
+                logger.debug(f"Evicting cached plan: {self._entries[slot]['description']}")
+            self._vectors[slot] = vector
+            self._occupied[slot] = True
+            self._hits[slot] = 0
+            self._last_used[slot] = time.time()
+            self._entries[slot] = {
+                "description": description,
+                "params": params,
+                "template": template,
+                "exact": templated < len(params),
+            }
+
+    def invalidate(self, description: str) -> bool:
+        """
+        Drop the entry that would serve ``description`` (e.g. its plan failed).
+
+        Returns:
+            bool: Whether an entry was removed
+        """
+        query = self.embed([description])[0]
+        with self._lock:
+            if not self._occupied.any():
+                return False
+            scores = self._vectors @ query
+            scores[~self._occupied] = -np.inf
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                return False
+            self._occupied[slot] = False
+            self._entries[slot] = None
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self),
+            "capacity": self.capacity,
+            "lookups": self.lookups,
+            "hits": self.hit_count,
+            "hit_rate": round(self.hit_count / self.lookups, 4) if self.lookups else 0.0,
+        }
+
+    def _eviction_candidate(self) -> int:
+        age = time.time() - self._last_used
+        usage = (1.0 + self._hits) * np.power(0.5, age / self.usage_half_life)
+        return int(np.argmin(usage))
+
+
+def _map_strings(value: Any, fn: Callable[[str], str]) -> Any:
+    if isinstance(value, str):
+        return fn(value)
+    if isinstance(value, list):
+        return [_map_strings(item, fn) for item in value]
+    if isinstance(value, dict):
+        return {key: _map_strings(item, fn) for key, item in value.items()}
+    return value
+
+
+def _make_template(plan: List[Dict[str, Any]], params: List[str]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Replace parameter values in a plan by placeholders.
+
+    Returns:
+        The template and how many of ``params`` received a placeholder
+    """
+    if not params:
+        return plan, 0
+    # One pass over an alternation, longest value first, so a value never
+    # clobbers a longer one containing it and inserted markers are never
+    # scanned again (a later "1" would otherwise match inside "\x0010\x00")
+    index = {}
+    for i, value in enumerate(params):
+        index.setdefault(value, i)
+    values = sorted(index, key=len, reverse=True)
+    pattern = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(v) for v in values) + r")(?!\w)")
+
+    used = set()
+
+    def placeholder(match: "re.Match") -> str:
+        used.add(index[match.group(0)])
+        return f"\x00{index[match.group(0)]}\x00"
+
+    def templatize(text: str) -> str:
+        return pattern.sub(placeholder, text)
+
+    # A repeated value only gets the placeholder of its first occurrence, so
+    # the later ones count as missing and the entry is served exactly
+    return _map_strings(plan, templatize), len(used)
+
+
+def _fill_template(template: List[Dict[str, Any]], params: List[str]) -> List[Dict[str, Any]]:
+    def fill(text: str) -> str:
+        return _MARKER_RE.sub(lambda m: params[int(m.group(1))], text)
+
+    return _map_strings(template, fill)
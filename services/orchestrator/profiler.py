@@ -0,0 +1,143 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+# Hard cap on a single profiling run
+MAX_PROFILE_SECONDS = 60.0
+
+# Leaf functions of a thread that is blocked rather than running; used to
+# drop idle threads when per-thread CPU time is not available
+IDLE_FUNCTIONS = frozenset({"wait", "select", "sleep", "get", "poll", "accept"})
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _schedstat_cpu_us(native_id: int) -> Optional[int]:
+    # First field: nanoseconds spent on a CPU
+    with open(f"/proc/self/task/{native_id}/schedstat") as f:
+        return int(f.read().split()[0]) // 1000
+
+
+def _stat_cpu_us(native_id: int) -> Optional[int]:
+    with open(f"/proc/self/task/{native_id}/stat") as f:
+        # utime and stime follow the parenthesised command name
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) * 1_000_000 // _CLOCK_TICKS
+
+
+def _cpu_clock() -> Optional[Callable[[int], Optional[int]]]:
+    """
+    Reader of a thread's consumed CPU time in microseconds, or None when the
+    platform does not expose per-thread CPU time (anything but Linux).
+    """
+    native_id = threading.get_native_id()
+    for reader in (_schedstat_cpu_us, _stat_cpu_us):
+        try:
+            reader(native_id)
+            return reader
+        except (OSError, ValueError, IndexError):
+            continue
+    return None
+
+
+def sample_stacks(seconds: float, interval: float = 0.005, mode: str = "cpu") -> Dict[str, Any]:
+    """
+    Sample the stacks of every thread in the process.
+
+    In ``cpu`` mode each sample is weighted by the CPU time the thread used
+    since the previous sample (read from /proc/self/task on Linux), so idle
+    threads parked in a wait contribute nothing and the weights are CPU
+    microseconds. Where per-thread CPU time is unavailable, threads whose
+    leaf frame is a known blocking call are skipped and each remaining
+    sample counts once. ``wall`` mode counts every thread in every sample,
+    running or waiting. Either way no instrumentation is needed and the
+    overhead is low, so it is safe to run against a live process.
+
+    Args:
+        seconds: How long to sample for (capped at MAX_PROFILE_SECONDS)
+        interval: Seconds between samples
+        mode: "cpu" or "wall"
+
+    Returns:
+        Dict with the sample count, the weight unit, the hottest functions by
+        self and total weight, and the stacks in collapsed (flame graph) format
+    """
+    seconds = max(0.0, min(seconds, MAX_PROFILE_SECONDS))
+    own_thread = threading.get_ident()
+    threads = {t.ident: t for t in threading.enumerate()}
+
+    cpu_clock = _cpu_clock() if mode == "cpu" else None
+    if cpu_clock is not None:
+        unit = "cpu_microseconds"
+    elif mode == "cpu":
+        unit = "active_samples"
+    else:
+        unit = "samples"
+    last_cpu: Dict[int, int] = {}
+
+    stacks: Counter = Counter()
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+
+            thread = threads.get(thread_id)
+            if thread is None:
+                # Started after profiling began
+                threads = {t.ident: t for t in threading.enumerate()}
+                thread = threads.get(thread_id)
+
+            weight = 1
+            if cpu_clock is not None:
+                native_id = getattr(thread, "native_id", None)
+                try:
+                    used = cpu_clock(native_id) if native_id else None
+                except (OSError, ValueError, IndexError):
+                    used = None
+                if used is None:
+                    continue
+                previous = last_cpu.get(thread_id)
+                last_cpu[thread_id] = used
+                weight = used - previous if previous is not None else 0
+            elif mode == "cpu" and frame.f_code.co_name in IDLE_FUNCTIONS:
+                weight = 0
+            if weight <= 0:
+                continue
+
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            name = thread.name if thread is not None else thread_id
+            labels.append(f"thread:{name}")
+            stacks[tuple(reversed(labels))] += weight
+        samples += 1
+        time.sleep(interval)
+
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    for stack, count in stacks.items():
+        self_counts[stack[-1]] += count
+        for label in set(stack):
+            total_counts[label] += count
+
+    return {
+        "seconds": seconds,
+        "interval": interval,
+        "mode": mode,
+        "unit": unit,
+        "samples": samples,
+        "top_self": [{"function": f, "weight": c} for f, c in self_counts.most_common(30)],
+        "top_total": [{"function": f, "weight": c} for f, c in total_counts.most_common(30)],
+        "collapsed": "\n".join(f"{';'.join(stack)} {count}" for stack, count in stacks.most_common()),
+    }
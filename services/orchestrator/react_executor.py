@@ -0,0 +1,273 @@
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("ReActExecutor")
+
+ToolFn = Callable[[Dict[str, Any]], Any]
+
+
+@dataclass
+class StepBudget:
+    """
+    Per-task limits for the ReAct loop.
+
+    A value of 0 (or less) disables the corresponding limit.
+    """
+    max_steps: int = 8
+    max_seconds: float = 300.0
+    max_tokens: int = 20000
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "StepBudget":
+        """
+        Build a budget from a config/request dict, ignoring unknown keys.
+
+        Args:
+            data: Dictionary with any of max_steps, max_seconds, max_tokens
+
+        Returns:
+            StepBudget instance
+        """
+        data = data or {}
+        defaults = cls()
+        return cls(
+            max_steps=int(data.get("max_steps", defaults.max_steps)),
+            max_seconds=float(data.get("max_seconds", defaults.max_seconds)),
+            max_tokens=int(data.get("max_tokens", defaults.max_tokens)),
+        )
+
+    def merged(self, overrides: Optional[Dict[str, Any]]) -> "StepBudget":
+        """
+        Return a copy of this budget with the given fields overridden.
+        """
+        return StepBudget.from_dict({**asdict(self), **(overrides or {})})
+
+
+class ToolRegistry:
+    """
+    Named tools the ReAct loop may invoke.
+
+    Tools are callables taking the action input dict. Coroutine functions are
+    awaited directly; plain functions run in a worker thread so a blocking
+    tool never stalls the other actions of the same batch.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, ToolFn] = {}
+        self._descriptions: Dict[str, str] = {}
+
+    def register(self, name: str, fn: ToolFn, description: str = "") -> None:
+        self._tools[name] = fn
+        self._descriptions[name] = description
+
+    def unregister(self, name: str) -> None:
+        self._tools.pop(name, None)
+        self._descriptions.pop(name, None)
+
+    def describe(self) -> List[Dict[str, str]]:
+        return [
+            {"name": name, "description": self._descriptions.get(name, "")}
+            for name in self._tools
+        ]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    async def invoke(self, name: str, tool_input: Dict[str, Any]) -> Any:
+        fn = self._tools[name]
+        if inspect.iscoroutinefunction(fn):
+            return await fn(tool_input)
+        result = await asyncio.to_thread(fn, tool_input)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+class ReActExecutor:
+    """
+    Iterative Thought → Action → Observation loop.
+
+    Each step asks the model for its next thought and a batch of actions.
+    All actions returned in one step are treated as independent and run
+    concurrently (unless the model sets ``"parallel": false``); their
+    observations are fed back into the context of the next step. The loop
+    stops when the model returns a ``final_answer``, when a step reports an
+    ``error`` (the model call itself failed) or when the budget runs out.
+    """
+
+    def __init__(
+        self,
+        think: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        tools: ToolRegistry,
+        max_parallel_actions: int = 8,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            think: Coroutine taking the loop context and returning the model's
+                step (thought, actions, final_answer, usage)
+            tools: Registry of tools the model may call
+            max_parallel_actions: Upper bound on concurrently running actions
+        """
+        self.think = think
+        self.tools = tools
+        self.max_parallel_actions = max(1, max_parallel_actions)
+
+    async def run(
+        self,
+        task: Dict[str, Any],
+        budget: StepBudget,
+    ) -> Dict[str, Any]:
+        """
+        Run the loop for a task until a final answer or budget exhaustion.
+
+        Args:
+            task: Task information passed to the model on every step
+            budget: Step, wall-clock and token limits for this run
+
+        Returns:
+            Dict with status, stop_reason, final_answer, error, steps and usage
+        """
+        started = time.monotonic()
+        deadline = started + budget.max_seconds if budget.max_seconds > 0 else None
+        history: List[Dict[str, Any]] = []
+        tokens_used = 0
+        status = "budget_exhausted"
+        stop_reason = "max_steps"
+        final_answer = None
+        error = None
+
+        step_index = 0
+        while budget.max_steps <= 0 or step_index < budget.max_steps:
+            remaining_seconds = None
+            if deadline is not None:
+                remaining_seconds = deadline - time.monotonic()
+                if remaining_seconds <= 0:
+                    stop_reason = "max_seconds"
+                    break
+
+            remaining_tokens = None
+            if budget.max_tokens > 0:
+                remaining_tokens = budget.max_tokens - tokens_used
+                if remaining_tokens <= 0:
+                    stop_reason = "max_tokens"
+                    break
+
+            context = {
+                "task": task,
+                "step": step_index + 1,
+                "history": history,
+                "tools": self.tools.describe(),
+                "budget_remaining": {
+                    "steps": (budget.max_steps - step_index) if budget.max_steps > 0 else None,
+                    "seconds": remaining_seconds,
+                    "tokens": remaining_tokens,
+                },
+            }
+
+            try:
+                step = await asyncio.wait_for(self.think(context), timeout=remaining_seconds)
+            except asyncio.TimeoutError:
+                stop_reason = "max_seconds"
+                break
+
+            tokens_used += int(step.get("usage", {}).get("total_tokens", 0) or 0)
+            step_index += 1
+
+            if step.get("error"):
+                # The model could not be reached; retrying immediately would
+                # only burn the remaining steps (or spin until max_seconds
+                # when steps are unlimited)
+                error = step["error"]
+                history.append({"thought": step.get("thought"), "actions": [], "observations": [], "error": error})
+                status = "failed"
+                stop_reason = "error"
+                break
+
+            if step.get("final_answer") is not None:
+                final_answer = step["final_answer"]
+                history.append({"thought": step.get("thought"), "actions": [], "observations": []})
+                status = "completed"
+                stop_reason = "final_answer"
+                break
+
+            actions = step.get("actions") or []
+            if not actions:
+                # Nothing to do and no answer: record the thought and let the
+                # model try again with the same observations.
+                history.append({"thought": step.get("thought"), "actions": [], "observations": []})
+                continue
+
+            remaining_seconds = deadline - time.monotonic() if deadline is not None else None
+            try:
+                observations = await asyncio.wait_for(
+                    self._run_actions(actions, parallel=step.get("parallel", True)),
+                    timeout=remaining_seconds,
+                )
+            except asyncio.TimeoutError:
+                history.append({
+                    "thought": step.get("thought"),
+                    "actions": actions,
+                    "observations": [{"error": "Step timed out"}] * len(actions),
+                })
+                stop_reason = "max_seconds"
+                break
+
+            history.append({
+                "thought": step.get("thought"),
+                "actions": actions,
+                "observations": observations,
+            })
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"ReAct loop finished: {status} ({stop_reason}) after {step_index} steps, "
+            f"{tokens_used} tokens, {elapsed:.2f}s"
+        )
+        return {
+            "status": status,
+            "stop_reason": stop_reason,
+            "final_answer": final_answer,
+            "error": error,
+            "steps": history,
+            "usage": {
+                "steps": step_index,
+                "tokens": tokens_used,
+                "seconds": round(elapsed, 3),
+            },
+        }
+
+    async def _run_actions(self, actions: List[Dict[str, Any]], parallel: bool = True) -> List[Any]:
+        """
+        Execute a batch of actions and return their observations in order.
+        """
+        if not parallel:
+            return [await self._run_action(action) for action in actions]
+
+        semaphore = asyncio.Semaphore(self.max_parallel_actions)
+
+        async def bounded(action: Dict[str, Any]) -> Any:
+            async with semaphore:
+                return await self._run_action(action)
+
+        return list(await asyncio.gather(*(bounded(action) for action in actions)))
+
+    async def _run_action(self, action: Dict[str, Any]) -> Any:
+        """
+        Execute a single action, converting failures into error observations.
+        """
+        tool = action.get("tool")
+        if tool not in self.tools:
+            return {"error": f"Unknown tool: {tool}"}
+        try:
+            return await self.tools.invoke(tool, action.get("input") or {})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Tool {tool} failed: {str(e)}")
+            return {"error": str(e)}
@@ -0,0 +1,161 @@
+from enum import Enum
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from react_executor import StepBudget
+
+
+class _ValueEnum(str, Enum):
+    """
+    String enum whose members compare, hash and format as their value.
+
+    Every record holding a status or priority references one shared member
+    instead of its own string, and existing comparisons against plain
+    strings (``status == "running"``, dict keys in config) keep working.
+    """
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class TaskStatus(_ValueEnum):
+    CREATED = "created"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+class TaskPriority(_ValueEnum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    HIGHEST = "highest"
+
+
+class TaskRecord:
+    """
+    In-memory state of a task.
+
+    Slots instead of a per-task dict: at hundreds of thousands of tasks the
+    repeated key tables, not the payload, dominate memory. Timestamps are
+    Unix seconds as floats, empty collections are shared empty tuples, and
+    tasks without budget overrides share the orchestrator's default budget.
+    Use to_dict() to produce the API representation.
+    """
+
+    __slots__ = (
+        "description", "priority", "status", "created_at", "deadline",
+        "sub_tasks", "budget", "result", "artifacts", "trace_parent",
+        "plan_source", "error", "progress",
+    )
+
+    def __init__(
+        self,
+        description: str,
+        priority: TaskPriority,
+        created_at: float,
+        deadline: float,
+        budget: StepBudget,
+        trace_parent: Optional[str] = None,
+    ):
+        self.description = description
+        self.priority = priority
+        self.status = TaskStatus.CREATED
+        self.created_at = created_at
+        self.deadline = deadline
+        self.sub_tasks: Sequence[Dict[str, Any]] = ()
+        self.budget = budget
+        self.result: Optional[Dict[str, Any]] = None
+        self.artifacts: Tuple[Dict[str, Any], ...] = ()
+        self.trace_parent = trace_parent
+        self.plan_source: Optional[str] = None
+        self.error: Optional[str] = None
+        # Latest callback state per agent dispatch, created on first update
+        self.progress: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def add_artifact(self, ref: Dict[str, Any]) -> None:
+        """
+        Attach an artifact reference unless one with the same digest exists.
+        """
+        if not any(a["digest"] == ref["digest"] for a in self.artifacts):
+            self.artifacts = self.artifacts + (ref,)
+
+    def replace_artifact(self, ref: Dict[str, Any]) -> None:
+        """
+        Attach an artifact reference, replacing any with the same name.
+        """
+        self.artifacts = tuple(a for a in self.artifacts if a["name"] != ref["name"]) + (ref,)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serialisable view of the task, as returned by the API.
+        """
+        budget = self.budget
+        data = {
+            "description": self.description,
+            "priority": self.priority.value,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "deadline": self.deadline,
+            "sub_tasks": list(self.sub_tasks),
+            # Built by hand: dataclasses.asdict deep-copies and is ~10x slower
+            "budget": {
+                "max_steps": budget.max_steps,
+                "max_seconds": budget.max_seconds,
+                "max_tokens": budget.max_tokens,
+            },
+            "result": self.result,
+            "artifacts": list(self.artifacts),
+            "trace_parent": self.trace_parent,
+            "plan_source": self.plan_source,
+            "progress": dict(self.progress) if self.progress else {},
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class AgentRecord:
+    """
+    A registered agent. Optional list fields are stored as tuples, or None
+    when absent.
+    """
+
+    __slots__ = ("name", "endpoint", "replicas", "description", "capabilities")
+
+    def __init__(
+        self,
+        name: str,
+        endpoint: str,
+        replicas: Optional[Sequence[str]] = None,
+        description: Optional[str] = None,
+        capabilities: Optional[Sequence[str]] = None,
+    ):
+        self.name = name
+        self.endpoint = endpoint
+        self.replicas = tuple(replicas) if replicas else None
+        self.description = description
+        self.capabilities = tuple(capabilities) if capabilities else None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentRecord":
+        """
+        Build a record from registration data, ignoring unknown keys.
+        """
+        return cls(
+            name=data["name"],
+            endpoint=data["endpoint"],
+            replicas=data.get("replicas"),
+            description=data.get("description"),
+            capabilities=data.get("capabilities"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "endpoint": self.endpoint,
+            "replicas": list(self.replicas) if self.replicas else None,
+            "description": self.description,
+            "capabilities": list(self.capabilities) if self.capabilities else None,
+        }
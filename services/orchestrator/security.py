@@ -0,0 +1,72 @@
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger("security")
+
+# No built-in default: a well-known key would let anyone mint an admin token.
+# Without JWT_SECRET every protected endpoint is refused.
+JWT_SECRET = os.environ.get("JWT_SECRET") or None
+if JWT_SECRET is None:
+    logger.warning("JWT_SECRET not set; protected endpoints are disabled")
+
+
+@lru_cache(maxsize=1)
+def _role_permissions() -> Dict[str, FrozenSet[str]]:
+    """
+    Map of role name to permissions, loaded from the RBAC configuration.
+    """
+    path = os.environ.get("RBAC_CONFIG_PATH", "/app/config/security/rbac.json")
+    try:
+        with open(path, "r") as f:
+            roles = json.load(f)["roles"]
+        return {name: frozenset(role.get("permissions", [])) for name, role in roles.items()}
+    except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+        logger.error(f"Failed to load RBAC configuration: {str(e)}")
+        # Fail closed: only an explicit admin role may use protected endpoints
+        return {"admin": frozenset({"manage_system"})}
+
+
+def require_permission(permission: str):
+    """
+    Build a dependency that requires a bearer JWT whose role grants ``permission``.
+
+    Tokens are HS256-signed with JWT_SECRET and carry the role in a ``role``
+    claim; permissions per role come from config/security/rbac.json. All
+    requests are refused when JWT_SECRET is not configured.
+    """
+    def dependency(request: Request) -> Dict[str, Any]:
+        if JWT_SECRET is None:
+            raise HTTPException(status_code=503, detail="Authentication is not configured")
+
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(
+                status_code=401,
+                detail="Missing bearer token",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+        import jwt
+
+        try:
+            claims = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        except jwt.PyJWTError as e:
+            raise HTTPException(
+                status_code=401,
+                detail=f"Invalid token: {str(e)}",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+        if permission not in _role_permissions().get(claims.get("role"), frozenset()):
+            raise HTTPException(status_code=403, detail=f"Permission {permission} required")
+        return claims
+
+    return dependency
+
+
+require_admin = require_permission("manage_system")
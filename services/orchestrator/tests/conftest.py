@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# The service modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "config", "agents", "agent-config.json"
+)
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    """Orchestrator using the repository config and a temporary blob store."""
+    monkeypatch.setenv("BLOB_STORE_PATH", str(tmp_path / "blobs"))
+    from orchestrator_agent import OrchestratorAgent
+
+    return OrchestratorAgent(CONFIG_PATH)
@@ -0,0 +1,140 @@
+import math
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, ProviderBudget, TokenBucket
+
+
+def test_client_id_header_is_ignored_from_untrusted_peers():
+    controller = AdmissionController()
+
+    assert controller.client_identity("203.0.113.7", "spoofed-1") == "203.0.113.7"
+    assert controller.client_identity("203.0.113.7", "spoofed-2") == "203.0.113.7"
+    assert controller.client_identity(None, "spoofed") == "anonymous"
+
+
+def test_client_id_header_is_honoured_from_trusted_proxies():
+    controller = AdmissionController({"trusted_proxies": ["10.0.0.0/8"]})
+
+    assert controller.client_identity("10.1.2.3", "team-a") == "proxy:team-a"
+    assert controller.client_identity("10.1.2.3", None) == "10.1.2.3"
+    assert controller.client_identity("198.51.100.1", "team-a") == "198.51.100.1"
+
+
+def test_rotating_client_ids_share_the_peer_bucket():
+    controller = AdmissionController({
+        "client_limits": {"medium": {"rate": 0.001, "burst": 2}},
+    })
+
+    for i in range(2):
+        controller.admit(controller.client_identity("203.0.113.7", f"id-{i}"), "medium", 0)
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit(controller.client_identity("203.0.113.7", "id-3"), "medium", 0)
+
+    assert rejected.value.status_code == 429
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import admission
+
+    fake = FakeClock()
+    monkeypatch.setattr(admission, "time", fake)
+    return fake
+
+
+def test_token_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=4)
+
+    assert all(bucket.try_acquire()[0] for _ in range(4))
+    ok, wait = bucket.try_acquire()
+    assert not ok
+    assert wait == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == (True, 0.0)
+
+    clock.now += 100
+    assert bucket.is_full()
+    assert bucket.tokens == 4
+
+
+def test_token_bucket_refund_is_capped(clock):
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    bucket.try_acquire(2)
+
+    bucket.refund(5)
+
+    assert bucket.tokens == 2
+
+
+def test_zero_rate_bucket_never_refills(clock):
+    bucket = TokenBucket(rate=0.0, capacity=1)
+    bucket.try_acquire()
+
+    assert bucket.try_acquire() == (False, math.inf)
+
+
+def test_low_priority_is_shed_before_highest():
+    controller = AdmissionController({"max_queue_depth": 100})
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit("client", "low", queue_depth=50)
+    assert rejected.value.status_code == 503
+    controller.admit("client", "highest", queue_depth=99)
+
+
+def test_provider_budget_limits_requests(clock):
+    budget = ProviderBudget({"openai": {"requests_per_minute": 2}})
+
+    assert budget.acquire("openai", 100)
+    assert budget.acquire("openai", 100)
+    assert not budget.acquire("openai", 100)
+    # Providers without limits are never throttled
+    assert budget.acquire("other", 10 ** 9)
+
+    clock.now += 30
+    assert budget.acquire("openai", 100)
+
+
+def test_provider_budget_settle_returns_unused_tokens(clock):
+    budget = ProviderBudget({"openai": {"tokens_per_minute": 1000}})
+
+    assert budget.acquire("openai", 800)
+    assert not budget.acquire("openai", 800)
+
+    budget.settle("openai", reserved=800, used=100)
+    assert budget.acquire("openai", 800)
+
+
+def test_provider_budget_failed_token_reservation_refunds_the_request(clock):
+    budget = ProviderBudget({"openai": {"requests_per_minute": 1, "tokens_per_minute": 100}})
+    budget._tokens["openai"].try_acquire(100)
+
+    assert not budget.acquire("openai", 50)
+    assert budget._requests["openai"].tokens == 1
+
+
+def test_queue_depth_stays_exact_under_concurrent_updates(orchestrator):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from records import TaskStatus
+
+    task_ids = [orchestrator.create_task(f"Research supplier {i}") for i in range(200)]
+
+    def run_and_finish(task_id):
+        orchestrator._set_task_status(task_id, TaskStatus.RUNNING)
+        orchestrator._finish_task(task_id, TaskStatus.COMPLETED)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(run_and_finish, task_ids[:150]))
+
+    assert orchestrator.queue_depth() == 50
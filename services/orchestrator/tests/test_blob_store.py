@@ -0,0 +1,89 @@
+import hashlib
+
+import pytest
+
+from blob_store import STREAM_CHUNK_SIZE, BlobStore, InvalidRange, parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    # Unsupported forms fall back to the full content
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=10-5", "bytes=-0", "bytes=a-b", "bytes=-"])
+def test_parse_range_rejects_unsatisfiable(header):
+    with pytest.raises(InvalidRange):
+        parse_range(header, 1000)
+
+
+def test_put_is_content_addressed_and_deduplicated(tmp_path):
+    store = BlobStore(str(tmp_path))
+
+    ref = store.put("hello")
+    again = store.put(b"hello")
+
+    assert ref == again == {"digest": hashlib.sha256(b"hello").hexdigest(), "size": 5}
+    assert store.get(ref["digest"]) == b"hello"
+    assert store.exists(ref["digest"])
+    assert not store.exists("not-a-digest")
+
+
+def test_path_rejects_traversal(tmp_path):
+    store = BlobStore(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        store.path("../../etc/passwd")
+
+
+def test_stream_ranges_across_chunks(tmp_path):
+    store = BlobStore(str(tmp_path))
+    data = bytes(range(256)) * (STREAM_CHUNK_SIZE // 256 * 2 + 3)
+    digest = store.put(data)["digest"]
+
+    chunks = list(store.stream(digest))
+    assert b"".join(chunks) == data
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert max(len(chunk) for chunk in chunks) <= STREAM_CHUNK_SIZE
+
+    start, end = STREAM_CHUNK_SIZE - 10, STREAM_CHUNK_SIZE + 10
+    assert b"".join(store.stream(digest, start, end)) == data[start:end + 1]
+
+
+def test_stream_empty_blob(tmp_path):
+    store = BlobStore(str(tmp_path))
+    digest = store.put(b"")["digest"]
+
+    assert list(store.stream(digest)) == []
+
+
+def test_root_is_created_on_first_put(tmp_path):
+    root = tmp_path / "missing" / "blobs"
+    store = BlobStore(str(root))
+
+    assert not root.exists()
+    assert not store.exists("0" * 64)
+
+    ref = store.put(b"hello")
+    assert store.get(ref["digest"]) == b"hello"
+
+
+def test_orchestrator_starts_without_blob_store_path(monkeypatch):
+    import blob_store
+    from conftest import CONFIG_PATH
+    from orchestrator_agent import OrchestratorAgent
+
+    monkeypatch.delenv("BLOB_STORE_PATH", raising=False)
+    orchestrator = OrchestratorAgent(CONFIG_PATH)
+
+    assert orchestrator.blob_store.root == blob_store.DEFAULT_ROOT
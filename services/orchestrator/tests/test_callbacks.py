@@ -0,0 +1,139 @@
+import asyncio
+
+from callbacks import CallbackUpdate, PendingDispatch, sign_dispatch, verify_token
+
+
+def test_tokens_are_bound_to_the_dispatch():
+    token = sign_dispatch("d1")
+
+    assert verify_token("d1", token)
+    assert not verify_token("d2", token)
+    assert not verify_token("d1", None)
+
+
+def _pending(orchestrator, task_id, dispatch_id="d1"):
+    dispatch = PendingDispatch(task_id, "research_agent", asyncio.get_running_loop().create_future())
+    orchestrator._dispatches[dispatch_id] = dispatch
+    return dispatch
+
+
+def test_large_progress_payload_is_stored_as_a_blob(orchestrator):
+    task_id = orchestrator.create_task("Research widget suppliers")
+    orchestrator.callback_inline_bytes = 64
+
+    async def scenario():
+        _pending(orchestrator, task_id)
+        await orchestrator.submit_callback("d1", 1, "progress", {"pct": 10})
+        await orchestrator.submit_callback("d1", 2, "progress", {"log": "x" * 1000})
+        await orchestrator.submit_callback("d1", 3, "progress", {"log": "y" * 1000})
+        orchestrator.apply_callback_updates(await orchestrator.callbacks.next_batch())
+
+    asyncio.run(scenario())
+
+    task = orchestrator.active_tasks[task_id]
+    entry = task.progress["d1"]
+    assert entry["seq"] == 3
+    assert entry["data"] is None
+    # Only the latest large payload is attached to the task
+    assert [a["digest"] for a in task.artifacts] == [entry["data_ref"]["digest"]]
+    with open(orchestrator.blob_store.path(entry["data_ref"]["digest"])) as f:
+        assert "y" * 1000 in f.read()
+
+
+def test_small_progress_payload_stays_inline(orchestrator):
+    task_id = orchestrator.create_task("Research widget suppliers")
+
+    async def scenario():
+        _pending(orchestrator, task_id)
+        await orchestrator.submit_callback("d1", 1, "progress", {"pct": 10})
+        orchestrator.apply_callback_updates(await orchestrator.callbacks.next_batch())
+
+    asyncio.run(scenario())
+
+    entry = orchestrator.active_tasks[task_id].progress["d1"]
+    assert entry["data"] == {"pct": 10}
+    assert entry["data_ref"] is None
+
+
+def _apply(orchestrator, task_id, updates):
+    """Register dispatch d1, apply ``updates`` as one batch, return the dispatch."""
+    async def scenario():
+        dispatch = _pending(orchestrator, task_id)
+        orchestrator.apply_callback_updates(updates)
+        return dispatch, (dispatch.future.result() if dispatch.future.done() else None)
+
+    return asyncio.run(scenario())
+
+
+def test_out_of_order_progress_keeps_the_latest(orchestrator):
+    task_id = orchestrator.create_task("Research widget suppliers")
+
+    _apply(orchestrator, task_id, [
+        CallbackUpdate("d1", 3, "progress", {"pct": 75}),
+        CallbackUpdate("d1", 1, "progress", {"pct": 25}),
+        CallbackUpdate("d1", 2, "progress", {"pct": 50}),
+    ])
+
+    entry = orchestrator.active_tasks[task_id].progress["d1"]
+    assert entry["seq"] == 3
+    assert entry["data"] == {"pct": 75}
+    assert entry["status"] == "running"
+
+
+def test_duplicates_and_late_updates_are_ignored(orchestrator):
+    task_id = orchestrator.create_task("Research widget suppliers")
+    ignored_before = orchestrator.callbacks_ignored
+
+    dispatch, result = _apply(orchestrator, task_id, [
+        CallbackUpdate("d1", 1, "progress", {"pct": 10}),
+        CallbackUpdate("d1", 1, "progress", {"pct": 10}),
+        CallbackUpdate("d1", 5, "result", {"answer": 42}),
+        CallbackUpdate("d1", 5, "result", {"answer": "duplicate"}),
+        CallbackUpdate("d1", 6, "progress", {"pct": 99}),
+        CallbackUpdate("d1", 7, "error", "too late"),
+    ])
+
+    assert result == {"answer": 42}
+    assert dispatch.done
+    assert orchestrator.callbacks_ignored - ignored_before == 4
+    entry = orchestrator.active_tasks[task_id].progress["d1"]
+    assert entry["status"] == "completed"
+    assert entry["seq"] == 5
+
+
+def test_result_completes_even_with_a_lower_seq(orchestrator):
+    task_id = orchestrator.create_task("Research widget suppliers")
+
+    _, result = _apply(orchestrator, task_id, [
+        CallbackUpdate("d1", 9, "progress", {"pct": 90}),
+        CallbackUpdate("d1", 2, "error", "agent crashed"),
+    ])
+
+    assert result == {"error": "agent crashed"}
+    assert orchestrator.active_tasks[task_id].progress["d1"]["status"] == "failed"
+
+
+def test_unknown_dispatches_are_dropped(orchestrator):
+    applied = orchestrator.apply_callback_updates([CallbackUpdate("never-issued", 1, "result", {})])
+
+    assert applied == 0
+    assert orchestrator.callbacks_ignored == 1
+
+
+def test_queue_batches_are_bounded():
+    from callbacks import CallbackQueue, CallbackQueueFull
+
+    async def scenario():
+        queue = CallbackQueue({"max_queue": 5, "max_batch": 3, "flush_interval_seconds": 0.01})
+        for seq in range(5):
+            queue.submit(CallbackUpdate("d1", seq, "progress"))
+        try:
+            queue.submit(CallbackUpdate("d1", 5, "progress"))
+            raise AssertionError("queue should be full")
+        except CallbackQueueFull:
+            pass
+        first = await queue.next_batch()
+        second = await queue.next_batch()
+        return [u.seq for u in first], [u.seq for u in second]
+
+    assert asyncio.run(scenario()) == ([0, 1, 2], [3, 4])
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import httpx
+
+from orchestrator_agent import DEADLINE_HEADER, current_deadline
+from records import TaskStatus
+
+
+def test_cancel_running_task(orchestrator):
+    task_id = orchestrator.create_task("Research widget suppliers")
+
+    interrupted = []
+
+    async def never_finishes(task_id):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            interrupted.append(task_id)
+            raise
+
+    orchestrator.run_react_loop = never_finishes
+
+    async def scenario():
+        assert orchestrator.execute_task(task_id)
+        runner = orchestrator.start_task(task_id)
+        await asyncio.sleep(0)
+        assert orchestrator.cancel_task(task_id)
+        await asyncio.wait_for(runner, 1)
+
+    asyncio.run(scenario())
+
+    assert interrupted == [task_id]
+    assert orchestrator.active_tasks[task_id].status == TaskStatus.CANCELLED
+    assert not orchestrator.cancel_task(task_id)
+    assert orchestrator.queue_depth() == 0
+
+
+def test_overdue_task_that_never_ran_times_out(orchestrator):
+    task_id = orchestrator.create_task("Research widget suppliers", deadline_seconds=0)
+    orchestrator.create_task("Research gadget suppliers", deadline_seconds=600)
+
+    assert orchestrator.expire_overdue_tasks() == 1
+    assert orchestrator.active_tasks[task_id].status == TaskStatus.TIMED_OUT
+    assert orchestrator.queue_depth() == 1
+
+
+def test_dispatch_propagates_deadline_and_caps_timeout(orchestrator):
+    seen = {}
+
+    def handler(request):
+        seen["headers"] = request.headers
+        seen["timeout"] = request.extensions["timeout"]
+        return httpx.Response(200, json={"ok": True})
+
+    orchestrator.callback_url = None
+    orchestrator.register_agent("research_agent", {"name": "Research", "endpoint": "http://agent/api"})
+
+    async def scenario():
+        orchestrator._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        deadline = time.time() + 5
+        current_deadline.set(deadline)
+        try:
+            return deadline, await orchestrator._dispatch_to_agent("research_agent", {"q": "x"})
+        finally:
+            await orchestrator.aclose()
+
+    deadline, result = asyncio.run(scenario())
+
+    assert result == {"ok": True}
+    assert float(seen["headers"][DEADLINE_HEADER]) == round(deadline, 3)
+    assert 0 < seen["timeout"]["read"] <= 5
+
+
+def test_dispatch_past_deadline_is_not_sent(orchestrator):
+    orchestrator.register_agent("research_agent", {"name": "Research", "endpoint": "http://agent/api"})
+
+    async def scenario():
+        current_deadline.set(time.time() - 1)
+        return await orchestrator._dispatch_to_agent("research_agent", {"q": "x"})
+
+    assert asyncio.run(scenario()) == {"error": "Task deadline exceeded"}
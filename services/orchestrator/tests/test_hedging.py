@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+
+from hedging import HedgePolicy, LatencyTracker
+
+
+def _primed(target="agent:a", latency=0.01, budget_ratio=1.0, samples=5):
+    policy = HedgePolicy({"enabled": True, "budget_ratio": budget_ratio, "min_samples": samples, "min_delay_seconds": 0.01})
+    for _ in range(samples):
+        policy.latencies.record(target, latency)
+    return policy
+
+
+def _after(seconds, value=None, error=None):
+    async def attempt():
+        await asyncio.sleep(seconds)
+        if error is not None:
+            raise error
+        return value
+
+    return attempt
+
+
+def test_latency_percentile_needs_min_samples():
+    tracker = LatencyTracker(min_samples=3)
+    tracker.record("t", 1.0)
+    assert tracker.percentile("t") is None
+
+    for latency in (2.0, 3.0, 4.0):
+        tracker.record("t", latency)
+    assert tracker.percentile("t", 0.5) == 3.0
+
+
+def test_no_hedge_when_disabled_or_without_backup():
+    policy = HedgePolicy({"enabled": False})
+    assert policy.hedge_delay("agent:a") is None
+
+    policy = _primed()
+    assert asyncio.run(policy.call("agent:a", _after(0, "primary"))) == "primary"
+    assert policy.stats()["hedges"] == 0
+
+
+def test_slow_primary_is_hedged_and_backup_wins():
+    policy = _primed()
+
+    result = asyncio.run(policy.call("agent:a", _after(1.0, "primary"), _after(0.0, "backup")))
+
+    stats = policy.stats()["targets"]["agent:a"]
+    assert result == "backup"
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_hedges_stay_within_budget():
+    policy = _primed(budget_ratio=0.5)
+
+    async def scenario():
+        for _ in range(4):
+            await policy.call("agent:a", _after(0.05, "primary"), _after(0.0, "backup"))
+
+    asyncio.run(scenario())
+
+    stats = policy.stats()
+    assert stats["calls"] == 4
+    assert stats["hedges"] <= 2
+
+
+def test_failed_attempt_falls_back_to_the_other():
+    policy = _primed()
+
+    result = asyncio.run(policy.call(
+        "agent:a", _after(0.05, error=RuntimeError("primary down")), _after(0.1, "backup")
+    ))
+
+    assert result == "backup"
+
+
+def test_primary_error_surfaces_when_all_attempts_fail():
+    policy = _primed()
+
+    with pytest.raises(RuntimeError, match="primary down"):
+        asyncio.run(policy.call(
+            "agent:a", _after(0.05, error=RuntimeError("primary down")), _after(0.0, error=ValueError("backup down"))
+        ))
+
+
+def test_losing_attempt_is_cancelled():
+    policy = _primed()
+    cancelled = []
+
+    async def slow_primary():
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    asyncio.run(policy.call("agent:a", slow_primary, _after(0.0, "backup")))
+
+    assert cancelled == [True]
+
+
+def test_call_sync_hedges_on_the_thread_pool():
+    policy = _primed(target="llm:m")
+
+    def slow():
+        time.sleep(0.5)
+        return "primary"
+
+    assert policy.call_sync("llm:m", slow, lambda: "backup") == "backup"
+    assert policy.stats()["targets"]["llm:m"]["hedge_wins"] == 1
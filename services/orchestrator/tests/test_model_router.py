@@ -0,0 +1,178 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import model_router
+from model_router import ModelRouter, ModelTarget
+
+ROUTING = {
+    "tiers": {
+        "fast": [{"provider": "openai", "model": "small"}, {"provider": "anthropic", "model": "small"}],
+        "standard": [{"provider": "openai", "model": "large"}, {"provider": "anthropic", "model": "large"}],
+    },
+    "priority_tiers": {"low": ["fast"], "medium": ["fast", "standard"], "highest": ["standard"]},
+    "complex_threshold": 0.6,
+    "min_confidence": 0.6,
+    "slo": {"p95_latency_ms": 1000, "max_error_rate": 0.25, "min_samples": 4, "cooldown_seconds": 60},
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(model_router, "time", fake)
+    return fake
+
+
+def _keys(ladder):
+    return [[target.key for target in tier] for tier in ladder]
+
+
+def test_tiers_follow_priority():
+    router = ModelRouter(ROUTING, "default")
+
+    assert _keys(router.route("low")) == [["openai/small", "anthropic/small"]]
+    assert _keys(router.route("medium")) == [
+        ["openai/small", "anthropic/small"], ["openai/large", "anthropic/large"]
+    ]
+    assert _keys(router.route("highest")) == [["openai/large", "anthropic/large"]]
+
+
+def test_complex_tasks_skip_the_cheapest_tier():
+    router = ModelRouter(ROUTING, "default")
+
+    assert _keys(router.route("medium", complexity=0.8)) == [["openai/large", "anthropic/large"]]
+    # A single allowed tier is never skipped
+    assert _keys(router.route("low", complexity=0.8)) == [["openai/small", "anthropic/small"]]
+
+
+def test_complexity_estimate():
+    assert ModelRouter.estimate_complexity("") == 0.0
+    simple = ModelRouter.estimate_complexity("What time is it in Paris?")
+    complex_ = ModelRouter.estimate_complexity(
+        "Design and implement a migration plan, then compare and evaluate the options\n" * 10
+    )
+    assert simple < 0.6 <= complex_
+
+
+def test_unconfigured_router_uses_default_model():
+    router = ModelRouter(None, "gpt-4o")
+
+    assert _keys(router.route("high")) == [["openai/gpt-4o"]]
+
+
+def test_slow_target_is_moved_back_for_the_cooldown(clock):
+    router = ModelRouter(ROUTING, "default")
+    slow = ModelTarget("openai", "small")
+    for _ in range(4):
+        router.record(slow, 2.0, True)
+
+    assert _keys(router.route("low")) == [["anthropic/small", "openai/small"]]
+    assert router.stats()["openai/small"]["healthy"] is False
+
+    clock.now += 61
+    assert _keys(router.route("low")) == [["openai/small", "anthropic/small"]]
+
+
+def test_failing_target_is_tripped_by_error_rate(clock):
+    router = ModelRouter(ROUTING, "default")
+    flaky = ModelTarget("openai", "small")
+    for ok in (True, False, True, False):
+        router.record(flaky, 0.1, ok)
+
+    assert _keys(router.route("low"))[0][0] == "anthropic/small"
+
+
+def test_target_within_slo_is_not_tripped(clock):
+    router = ModelRouter(ROUTING, "default")
+    target = ModelTarget("openai", "small")
+    for ok in (True, True, True, False):
+        router.record(target, 0.5, ok)
+
+    assert _keys(router.route("low"))[0][0] == "openai/small"
+
+
+def _response(confidence):
+    content = json.dumps({"thought": "t", "actions": [], "confidence": confidence, "final_answer": "done"})
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=10),
+    )
+
+
+@pytest.fixture
+def routed(orchestrator):
+    orchestrator.model_router = ModelRouter(ROUTING, "default")
+    return orchestrator
+
+
+def _context(priority="medium"):
+    return {"task": {"description": "What time is it in Paris?", "priority": priority}, "step": 1}
+
+
+def test_low_confidence_escalates_to_next_tier(routed):
+    calls = []
+
+    def fake_call(target, messages, max_tokens, reserved_tokens, budget_wait=0.0):
+        calls.append(target.key)
+        return target, _response(0.2 if target.model == "small" else 0.9)
+
+    routed._call_llm = fake_call
+
+    result = routed.think_action_observation(_context())
+
+    assert calls == ["openai/small", "openai/large"]
+    assert result["model"] == "openai/large"
+    assert result["usage"] == {"total_tokens": 20}
+
+
+def test_confident_answer_stops_at_cheapest_tier(routed):
+    calls = []
+
+    def fake_call(target, messages, max_tokens, reserved_tokens, budget_wait=0.0):
+        calls.append(target.key)
+        return target, _response(0.9)
+
+    routed._call_llm = fake_call
+
+    assert routed.think_action_observation(_context())["model"] == "openai/small"
+    assert calls == ["openai/small"]
+
+
+def test_failed_call_fails_over_within_the_tier(routed):
+    calls = []
+
+    def fake_call(target, messages, max_tokens, reserved_tokens, budget_wait=0.0):
+        calls.append(target.key)
+        if target.provider == "openai":
+            raise RuntimeError("provider down")
+        return target, _response(0.9)
+
+    routed._call_llm = fake_call
+
+    result = routed.think_action_observation(_context())
+
+    assert calls == ["openai/small", "anthropic/small"]
+    assert result["model"] == "anthropic/small"
+    assert "error" not in result
+
+
+def test_all_targets_failing_reports_the_error(routed):
+    def fake_call(target, messages, max_tokens, reserved_tokens, budget_wait=0.0):
+        raise RuntimeError("provider down")
+
+    routed._call_llm = fake_call
+
+    result = routed.think_action_observation(_context("low"))
+
+    assert result["error"] == "provider down"
+    assert result["final_answer"] is None
@@ -0,0 +1,76 @@
+from plan_cache import PlanCache, extract_parameters
+
+
+def _plan(description):
+    return [{"id": "s1", "agent": "research_agent", "description": description, "depends_on": []}]
+
+
+def test_extract_parameters():
+    assert extract_parameters('Compare "Acme Corp" and 3 others at https://example.com/x') == [
+        "Acme Corp", "3", "https://example.com/x"
+    ]
+
+
+def test_hit_substitutes_new_parameters():
+    cache = PlanCache(capacity=4)
+    cache.store("Find top 5 vendors for widgets", _plan("list 5 vendors"))
+
+    assert cache.lookup("Find top 8 vendors for widgets") == _plan("list 8 vendors")
+    assert cache.stats()["hits"] == 1
+
+
+def test_overlapping_numeric_parameters_are_not_corrupted():
+    cache = PlanCache(capacity=4)
+    cache.store("Buy 1 item for 10 dollars", _plan("buy 1 item at 10"))
+
+    plan = cache.lookup("Buy 10 item for 1 dollars")
+
+    assert plan == _plan("buy 10 item at 1")
+    assert "\x00" not in plan[0]["description"]
+
+
+def test_repeated_parameter_values():
+    cache = PlanCache(capacity=4)
+    cache.store("Pick 3 vendors in 2 regions, budget 2000", _plan("3 vendors, 2 regions, 2000 total"))
+
+    plan = cache.lookup("Pick 4 vendors in 4 regions, budget 500")
+
+    assert plan == _plan("4 vendors, 4 regions, 500 total")
+
+
+def test_quoted_parameter_is_substituted_without_quotes():
+    cache = PlanCache(capacity=4)
+    cache.store('Research the company "Acme Corp" and summarise it', _plan("Research Acme Corp"))
+
+    assert cache.lookup('Research the company "Globex" and summarise it') == _plan("Research Globex")
+
+
+def test_plan_missing_a_parameter_only_serves_exact_parameters():
+    cache = PlanCache(capacity=4)
+    cache.store('Research the company "Acme Corp" and summarise it', _plan("Research the company"))
+
+    assert cache.lookup('Research the company "Globex" and summarise it') is None
+    assert cache.lookup('Research the company "Acme Corp" and summarise it') == _plan("Research the company")
+
+
+def test_parameter_count_mismatch_misses():
+    cache = PlanCache(capacity=4)
+    cache.store("Find top 5 vendors for widgets", _plan("list 5 vendors"))
+
+    assert cache.lookup("Find top vendors for widgets") is None
+
+
+def test_eviction_keeps_size_bounded():
+    cache = PlanCache(capacity=2)
+    for topic in ["widgets", "gadgets", "sprockets"]:
+        cache.store(f"Research {topic} suppliers", _plan(topic))
+
+    assert len(cache) == 2
+
+
+def test_invalidate_removes_entry():
+    cache = PlanCache(capacity=4)
+    cache.store("Research widget suppliers", _plan("widgets"))
+
+    assert cache.invalidate("Research widget suppliers")
+    assert cache.lookup("Research widget suppliers") is None
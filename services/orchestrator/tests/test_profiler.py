@@ -0,0 +1,44 @@
+import threading
+
+from profiler import sample_stacks
+
+
+def _busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _idle(stop):
+    stop.wait()
+
+
+def _run_with_threads(**kwargs):
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_busy, args=(stop,), name="busy", daemon=True),
+        threading.Thread(target=_idle, args=(stop,), name="idle", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        return sample_stacks(0.5, **kwargs)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def test_cpu_mode_ignores_idle_threads():
+    profile = _run_with_threads(mode="cpu")
+
+    assert profile["unit"] in ("cpu_microseconds", "active_samples")
+    assert "thread:busy" in profile["collapsed"]
+    assert "thread:idle" not in profile["collapsed"]
+
+
+def test_wall_mode_counts_waiting_threads():
+    profile = _run_with_threads(mode="wall")
+
+    assert profile["unit"] == "samples"
+    assert "thread:idle" in profile["collapsed"]
+    assert profile["samples"] > 0
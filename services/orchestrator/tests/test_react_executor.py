@@ -0,0 +1,90 @@
+import asyncio
+import functools
+
+from react_executor import ReActExecutor, StepBudget, ToolRegistry
+
+
+def _run(executor, budget):
+    return asyncio.run(executor.run({"description": "test"}, budget))
+
+
+def _scripted(steps):
+    calls = []
+
+    async def think(context):
+        calls.append(context)
+        return steps[min(len(calls), len(steps)) - 1]
+
+    return think, calls
+
+
+def test_final_answer_completes():
+    think, calls = _scripted([{"final_answer": "done", "usage": {"total_tokens": 5}}])
+
+    result = _run(ReActExecutor(think, ToolRegistry()), StepBudget())
+
+    assert result["status"] == "completed"
+    assert result["final_answer"] == "done"
+    assert result["usage"]["tokens"] == 5
+    assert len(calls) == 1
+
+
+def test_model_error_stops_the_loop():
+    think, calls = _scripted([{"actions": [], "final_answer": None, "error": "provider unavailable"}])
+
+    # Unlimited steps: without the error check this would spin until max_seconds
+    result = _run(ReActExecutor(think, ToolRegistry()), StepBudget(max_steps=0, max_seconds=5))
+
+    assert result["status"] == "failed"
+    assert result["stop_reason"] == "error"
+    assert result["error"] == "provider unavailable"
+    assert len(calls) == 1
+
+
+def test_actions_run_and_feed_observations_back():
+    tools = ToolRegistry()
+    tools.register("echo", lambda tool_input: {"echo": tool_input["value"]})
+
+    async def agent(tool_input):
+        return {"agent": tool_input["value"]}
+
+    tools.register("agent", agent)
+    think, calls = _scripted([
+        {"actions": [
+            {"tool": "echo", "input": {"value": 1}},
+            {"tool": "agent", "input": {"value": 2}},
+            {"tool": "missing", "input": {}},
+        ]},
+        {"final_answer": "ok"},
+    ])
+
+    result = _run(ReActExecutor(think, tools), StepBudget())
+
+    assert result["status"] == "completed"
+    assert calls[1]["history"][0]["observations"] == [
+        {"echo": 1}, {"agent": 2}, {"error": "Unknown tool: missing"}
+    ]
+
+
+def test_step_budget_exhausted():
+    think, calls = _scripted([{"actions": []}])
+
+    result = _run(ReActExecutor(think, ToolRegistry()), StepBudget(max_steps=3))
+
+    assert result["status"] == "budget_exhausted"
+    assert result["stop_reason"] == "max_steps"
+    assert len(calls) == 3
+
+
+def test_partial_of_coroutine_function_is_awaited_on_the_loop(monkeypatch):
+    async def dispatch(agent_id, tool_input):
+        return {"agent": agent_id, **tool_input}
+
+    def no_threads(*args, **kwargs):
+        raise AssertionError("coroutine tools must not go through a worker thread")
+
+    tools = ToolRegistry()
+    tools.register("research_agent", functools.partial(dispatch, "research_agent"))
+    monkeypatch.setattr(asyncio, "to_thread", no_threads)
+
+    assert asyncio.run(tools.invoke("research_agent", {"q": 1})) == {"agent": "research_agent", "q": 1}
@@ -0,0 +1,42 @@
+import jwt
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+import security
+
+
+def _client():
+    app = FastAPI()
+
+    @app.get("/admin", dependencies=[Depends(security.require_admin)])
+    def admin():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def _token(secret, role="admin"):
+    return {"Authorization": f"Bearer {jwt.encode({'role': role}, secret, algorithm='HS256')}"}
+
+
+@pytest.fixture(autouse=True)
+def admin_role(monkeypatch):
+    monkeypatch.setattr(security, "_role_permissions", lambda: {"admin": frozenset({"manage_system"})})
+
+
+def test_requests_are_refused_without_a_configured_secret(monkeypatch):
+    monkeypatch.setattr(security, "JWT_SECRET", None)
+
+    response = _client().get("/admin", headers=_token("371gpt-jwt-secret"))
+
+    assert response.status_code == 503
+
+
+def test_admin_token_signed_with_the_secret_is_accepted(monkeypatch):
+    monkeypatch.setattr(security, "JWT_SECRET", "s" * 32)
+    client = _client()
+
+    assert client.get("/admin", headers=_token("s" * 32)).status_code == 200
+    assert client.get("/admin", headers=_token("other-secret" * 3)).status_code == 401
+    assert client.get("/admin", headers=_token("s" * 32, role="viewer")).status_code == 403
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+import startup_profile
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+
+
+def test_service_copies_are_identical():
+    with open(os.path.join(SERVICES_DIR, "orchestrator", "startup_profile.py"), "rb") as f:
+        orchestrator_copy = f.read()
+    with open(os.path.join(SERVICES_DIR, "ui", "startup_profile.py"), "rb") as f:
+        ui_copy = f.read()
+
+    assert orchestrator_copy == ui_copy
+
+
+@pytest.fixture
+def profile(monkeypatch):
+    """Fresh profiler state; the import hook is removed afterwards."""
+    monkeypatch.setattr(startup_profile, "_imports", {})
+    monkeypatch.setattr(startup_profile, "_phases", {})
+    monkeypatch.setattr(startup_profile, "_finder", None)
+    monkeypatch.setattr(sys, "meta_path", list(sys.meta_path))
+    return startup_profile
+
+
+def test_report_is_none_when_disabled(profile, monkeypatch):
+    monkeypatch.setattr(profile, "_enabled", False)
+    profile.install_if_enabled()
+    with profile.phase("config"):
+        pass
+
+    assert profile.report() is None
+    assert profile._finder is None
+    assert profile.format_report() == "Startup profiling disabled"
+
+
+def test_report_records_phases_and_imports(profile, monkeypatch, tmp_path):
+    monkeypatch.setattr(profile, "_enabled", True)
+    (tmp_path / "startup_profile_probe.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "startup_profile_probe", raising=False)
+
+    profile.install_if_enabled()
+    with profile.phase("config"):
+        import startup_profile_probe  # noqa: F401
+
+    data = profile.report()
+
+    assert "config" in data["phases_ms"]
+    assert data["modules_imported"] >= 1
+    assert "startup_profile_probe" in [row["module"] for row in data["slowest_imports_ms"]]
+    assert "phase" in profile.format_report()
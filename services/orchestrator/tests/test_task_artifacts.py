@@ -0,0 +1,23 @@
+import asyncio
+import threading
+
+
+def test_store_task_artifact_runs_off_the_event_loop(orchestrator, monkeypatch):
+    task_id = orchestrator.create_task("Research widget suppliers")
+    threads = []
+    put = orchestrator.blob_store.put
+
+    def recording_put(data):
+        threads.append(threading.current_thread())
+        return put(data)
+
+    monkeypatch.setattr(orchestrator.blob_store, "put", recording_put)
+
+    ref = asyncio.run(orchestrator.store_task_artifact(task_id, b"x" * 1024, "out.bin"))
+    # Storing the same content twice attaches it once
+    asyncio.run(orchestrator.store_task_artifact(task_id, b"x" * 1024, "out.bin"))
+
+    assert all(thread is not threading.main_thread() for thread in threads)
+    assert ref["size"] == 1024
+    assert orchestrator.get_task_artifact(task_id, ref["digest"]) == ref
+    assert len(orchestrator.active_tasks[task_id].artifacts) == 1
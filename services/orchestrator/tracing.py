@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger("Tracing")
+
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "371gpt-orchestrator")
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class SpanContext:
+    """Identifiers of a span, as carried in a W3C traceparent header."""
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name", "context", "parent_span_id", "kind",
+        "start_ns", "end_ns", "attributes", "status", "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        kind: int = KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ):
+        trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.name = name
+        self.context = SpanContext(trace_id, f"{random.getrandbits(64):016x}")
+        self.parent_span_id = parent.span_id if parent else None
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            _exporter.submit(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class _BatchExporter:
+    """
+    Exports finished spans in OTLP/JSON from a background thread.
+
+    Spans are written as one ExportTraceServiceRequest per line to
+    TRACE_EXPORT_FILE and/or POSTed to an OTLP/HTTP collector at
+    OTEL_EXPORTER_OTLP_ENDPOINT (``/v1/traces`` is appended). With neither
+    configured, spans are dropped.
+    """
+
+    def __init__(self, max_batch: int = 512, flush_interval: float = 2.0, max_queue: int = 10000):
+        self.file_path = os.environ.get("TRACE_EXPORT_FILE")
+        endpoint = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+        self.endpoint = f"{endpoint.rstrip('/')}/v1/traces" if endpoint else None
+        self.enabled = bool(self.file_path or self.endpoint)
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, span: Span) -> None:
+        if not self.enabled:
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            # Tracing must never slow down or fail the traced work
+            pass
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._export(batch)
+
+    def _export(self, batch: List[Span]) -> None:
+        payload = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": "371gpt.tracing"},
+                    "spans": [span.to_otlp() for span in batch],
+                }],
+            }]
+        })
+        if self.file_path:
+            try:
+                with open(self.file_path, "a") as f:
+                    f.write(payload + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to write spans to {self.file_path}: {str(e)}")
+        if self.endpoint:
+            request = urllib.request.Request(
+                self.endpoint,
+                data=payload.encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            try:
+                urllib.request.urlopen(request, timeout=5).close()
+            except Exception as e:
+                logger.warning(f"Failed to export spans to {self.endpoint}: {str(e)}")
+
+
+_exporter = _BatchExporter()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """
+    Parse a W3C traceparent header value.
+    """
+    match = _TRACEPARENT_RE.match((value or "").strip().lower())
+    if not match or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return SpanContext(match.group(1), match.group(2))
+
+
+def extract(headers: Mapping[str, str]) -> Optional[SpanContext]:
+    """
+    Trace context from incoming request headers.
+    """
+    return parse_traceparent(headers.get("traceparent"))
+
+
+def inject(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Add the current trace context to outgoing request headers.
+    """
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.context.traceparent
+    return headers
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[SpanContext] = None,
+    kind: int = KIND_INTERNAL,
+    start_ns: Optional[int] = None,
+) -> Iterator[Span]:
+    """
+    Run a block inside a new span, child of ``parent`` or the current span.
+
+    The span is current for the block (including coroutines and threads
+    started from it with a copied context) and is ended and exported when
+    the block exits. Exceptions mark the span as failed and propagate.
+
+    Args:
+        name: Span name
+        attributes: Initial span attributes
+        parent: Explicit parent, e.g. extracted from a traceparent header
+        kind: OTLP span kind
+        start_ns: Start time in Unix nanoseconds, defaults to now
+    """
+    if parent is None:
+        current = _current_span.get()
+        parent = current.context if current is not None else None
+    span = Span(name, parent, kind, attributes, start_ns)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
@@ -1,11 +1,18 @@
+import startup_profile
+
+# Must run before the remaining imports so they are included in the profile
+startup_profile.install_if_enabled()
+
 import os
 import json
+import secrets
 import time
 import asyncio
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
 import httpx
+from fastapi.responses import JSONResponse
 from loguru import logger
 from nicegui import ui, app
 from dotenv import load_dotenv
@@ -18,21 +25,47 @@ ORCHESTRATOR_URL = os.getenv("ORCHESTRATOR_URL", "http://orchestrator:8080")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 JWT_SECRET = os.getenv("JWT_SECRET", "371gpt-jwt-secret")
 
-# Setup logging
-logger.remove()
-logger.add(
-    "logs/ui.log", 
-    rotation="10 MB", 
-    level=LOG_LEVEL, 
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
-)
-logger.add(lambda msg: app.storage.user.setdefault("logs", []).append(msg), level=LOG_LEVEL)
+# Set when startup has finished; reported by the readiness endpoint
+_ready = False
+
+# Setup logging (called on startup, not at import, so importing the module
+# does not open log files)
+def setup_logging():
+    logger.remove()
+    logger.add(
+        "logs/ui.log", 
+        rotation="10 MB", 
+        level=LOG_LEVEL, 
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
+    )
+    logger.add(lambda msg: app.storage.user.setdefault("logs", []).append(msg), level=LOG_LEVEL)
+
+# Start a W3C trace for each orchestrator call; the orchestrator continues it
+# in its own spans and returns the traceparent it used
+async def inject_trace_context(request: httpx.Request):
+    if "traceparent" not in request.headers:
+        request.headers["traceparent"] = f"00-{secrets.token_hex(16)}-{secrets.token_hex(8)}-01"
 
 # API client for connecting to the orchestrator
 class OrchestratorClient:
     def __init__(self, base_url: str):
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use, inside the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                event_hooks={"request": [inject_trace_context]}
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def get_agents(self) -> List[Dict[str, Any]]:
         try:
@@ -94,9 +127,25 @@ class OrchestratorClient:
             logger.error(f"Error checking health: {str(e)}")
             return {"status": "error", "error": str(e)}
 
-# Initialize client
+# Initialize client (the underlying HTTP client is created lazily)
 orchestrator_client = OrchestratorClient(ORCHESTRATOR_URL)
 
+async def on_startup():
+    global _ready
+    with startup_profile.phase("setup_logging"):
+        setup_logging()
+    _ready = True
+    if startup_profile.enabled():
+        logger.info(startup_profile.format_report())
+
+async def on_shutdown():
+    global _ready
+    _ready = False
+    await orchestrator_client.close()
+
+app.on_startup(on_startup)
+app.on_shutdown(on_shutdown)
+
 # UI Elements
 @ui.page('/')
 def index():
@@ -267,5 +316,20 @@ def logs():
 def healthcheck():
     return 'OK'
 
+@app.get('/readyz')
+def readiness():
+    return JSONResponse(
+        status_code=200 if _ready else 503,
+        content={'status': 'ready' if _ready else 'starting'}
+    )
+
+@app.get('/debug/startup')
+def startup_report():
+    report = startup_profile.report()
+    if report is None:
+        return JSONResponse(status_code=404, content={'error': 'Startup profiling is disabled'})
+    return report
+
 # Start the application
-ui.run(title='371GPT UI', host='0.0.0.0', port=8000, reload=False)
\ No newline at end of file
+if __name__ in {'__main__', '__mp_main__'}:
+    ui.run(title='371GPT UI', host='0.0.0.0', port=8000, reload=False)
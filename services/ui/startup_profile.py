@@ -0,0 +1,146 @@
+"""
+Startup profiling: per-module import time and named init phases.
+
+Enabled with STARTUP_PROFILE=1. Call install_if_enabled() before any other
+import in the service entry point; every module imported afterwards is
+timed, and phase() blocks record initialisation steps. When profiling is
+disabled all functions are no-ops.
+
+Each service is built from its own Docker context, so services/orchestrator
+and services/ui carry identical copies of this file; a test in the
+orchestrator suite fails when they diverge.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_enabled = os.environ.get("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+_process_start = time.perf_counter()
+_imports: Dict[str, Dict[str, float]] = {}
+_phases: Dict[str, float] = {}
+_stack: List[List[Any]] = []
+_finder = None
+
+
+class _TimedLoader:
+    """Proxy around a module loader that times exec_module."""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        name = module.__name__
+        # [name, start, time spent importing children]
+        frame = [name, time.perf_counter(), 0.0]
+        _stack.append(frame)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            _stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            _imports[name] = {"cumulative": elapsed, "self": elapsed - frame[2]}
+            if _stack:
+                _stack[-1][2] += elapsed
+
+
+class _ImportTimer:
+    """Meta path finder that wraps the loader found by the other finders."""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader)
+        return spec
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def install_if_enabled() -> None:
+    """
+    Start timing imports if STARTUP_PROFILE is set.
+    """
+    global _finder
+    if _enabled and _finder is None:
+        _finder = _ImportTimer()
+        sys.meta_path.insert(0, _finder)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time a named initialisation step.
+    """
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = time.perf_counter() - started
+
+
+def report(top: int = 25) -> Optional[Dict[str, Any]]:
+    """
+    Summarise the startup profile.
+
+    Args:
+        top: Number of slowest modules (by self time) to include
+
+    Returns:
+        Dict with total startup time, init phases and slowest imports in
+        milliseconds, or None when profiling is disabled
+    """
+    if not _enabled:
+        return None
+    slowest = sorted(_imports.items(), key=lambda item: item[1]["self"], reverse=True)[:top]
+    return {
+        "since_process_start_ms": round((time.perf_counter() - _process_start) * 1000, 1),
+        "modules_imported": len(_imports),
+        "import_total_ms": round(sum(t["self"] for t in _imports.values()) * 1000, 1),
+        "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in _phases.items()},
+        "slowest_imports_ms": [
+            {
+                "module": name,
+                "self": round(t["self"] * 1000, 2),
+                "cumulative": round(t["cumulative"] * 1000, 2),
+            }
+            for name, t in slowest
+        ],
+    }
+
+
+def format_report(top: int = 25) -> str:
+    """
+    Render the startup profile as a plain-text table for the logs.
+    """
+    data = report(top)
+    if data is None:
+        return "Startup profiling disabled"
+    lines = [
+        f"Startup profile: {data['since_process_start_ms']} ms since process start, "
+        f"{data['modules_imported']} modules imported in {data['import_total_ms']} ms"
+    ]
+    for name, ms in data["phases_ms"].items():
+        lines.append(f"  phase  {ms:>9.1f} ms  {name}")
+    for row in data["slowest_imports_ms"]:
+        lines.append(f"  import {row['self']:>9.2f} ms  (cum {row['cumulative']:.2f} ms)  {row['module']}")
+    return "\n".join(lines)